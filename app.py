@@ -4,15 +4,11 @@ StreamlitベースのWebアプリケーション
 """
 
 import streamlit as st
-import os
-import sys
-from pathlib import Path
+import numpy as np
+import hashlib
+import weakref
 
-# プロジェクトルートをパスに追加
-project_root = Path(__file__).parent
-sys.path.append(str(project_root))
-
-from yolo_model_manager import YOLOModelManager
+from yolo_model_manager import YOLOModelManager, YOLOModelLoader
 from yolo_visualization import YOLOv8VisualizationManager
 from ui_components import (
     YOLOUIComponents,
@@ -30,7 +26,7 @@ st.set_page_config(
 )
 
 # カスタムCSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
@@ -59,14 +55,127 @@ st.markdown("""
         background: linear-gradient(90deg, #5a6fd8 0%, #6a4190 100%);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# ヘッダーHTML
+HEADER_HTML = """
+<div class="main-header">
+    <h1>🎯 YOLO物体検出アプリケーション</h1>
+    <p>リアルタイム物体検出と可視化ツール</p>
+</div>
+"""
+
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# 生成済みのモデルマネージャー（破棄時にバッチ推論ワーカーを停止するため、モデル名で引く）
+_model_managers: "weakref.WeakValueDictionary[str, YOLOModelManager]" = weakref.WeakValueDictionary()
+
+@st.cache_resource
+def _get_model_manager(model_name: str) -> YOLOModelManager:
+    """
+    モデル名ごとにモデルマネージャーを生成し、リラン・セッション間で共有します
+    
+    Args:
+        model_name: モデル名
+        
+    Returns:
+        モデルを読み込み済みのモデルマネージャー
+    """
+    manager = YOLOModelManager()
+    manager.load_model(model_name)
+    _model_managers[model_name] = manager
+    return manager
+
+
+def _release_model(model_name: str) -> None:
+    """
+    指定したモデルのモデルマネージャーとモデルだけをキャッシュから破棄します
+    
+    キャッシュはセッション間で共有されるため、他のセッションが使用している
+    別のモデルのエントリーは残します。バッチ推論ワーカーの推論スレッドは
+    マネージャーを参照し続けるため、先に停止してからキャッシュを破棄します。
+    
+    Args:
+        model_name: 破棄するモデル名
+    """
+    manager = _model_managers.pop(model_name, None)
+    if manager is not None:
+        manager.close()
+    _get_model_manager.clear(model_name)
+    YOLOModelLoader.release_cached_model(model_name)
+
+
+def _image_digest(image_array: np.ndarray) -> str:
+    """
+    検出結果のキャッシュキーにする画像のハッシュを計算します
+    
+    画素のバイト列が同じでも形状や型が異なる画像は別の画像として扱うため、
+    形状と型もハッシュに含めます。
+    
+    Args:
+        image_array: RGBのndarray
+        
+    Returns:
+        SHA-1ハッシュの16進文字列
+    """
+    digest = hashlib.sha1(f"{image_array.shape}:{image_array.dtype}".encode())
+    digest.update(np.ascontiguousarray(image_array))
+    return digest.hexdigest()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_detect(
+    image_digest: str,
+    _image,
+    confidence: float,
+    nms_threshold: float,
+    model_name: str
+):
+    """
+    検出結果を(画像ハッシュ, 信頼度閾値, NMS閾値, モデル名)ごとにキャッシュします
+    
+    可視化設定の切り替えなど検出条件が変わらないリランでは推論を再実行しません。
+    画像本体は引数名を_で始めてハッシュ対象から外し、image_digestで識別します。
+    
+    Args:
+        image_digest: 画像データのSHA-1ハッシュ
+        _image: 入力画像
+        confidence: 信頼度閾値
+        nms_threshold: NMS閾値
+        model_name: モデル名
+        
+    Returns:
+        検出結果
+        
+    Raises:
+        RuntimeError: 検出に失敗した場合（失敗はキャッシュされず、次回は推論を再実行する）
+    """
+    results = _get_model_manager(model_name).detect_objects(
+        _image,
+        confidence=confidence,
+        nms_threshold=nms_threshold
+    )
+    if results is None:
+        raise RuntimeError("検出結果を取得できませんでした")
+    return results
+
 
 class YOLOApp:
     """YOLO物体検出アプリケーションのメインクラス"""
     
     def __init__(self):
         """アプリケーションの初期化"""
-        self.model_manager = YOLOModelManager()
+        self.model_name = st.session_state.get(
+            "selected_model", YOLOModelLoader.DEFAULT_MODEL_NAME
+        )
+        
+        # モデルが切り替えられた場合は、前のモデルだけをキャッシュから破棄してGPUメモリを解放する
+        loaded_model_name = st.session_state.get("loaded_model_name")
+        if loaded_model_name is not None and loaded_model_name != self.model_name:
+            _release_model(loaded_model_name)
+        st.session_state.loaded_model_name = self.model_name
+        
+        self.model_manager = _get_model_manager(self.model_name)
         self.ui_components = YOLOUIComponents()
         self.image_upload = ImageUploadComponent()
         self.detection_result = DetectionResultComponent()
@@ -77,8 +186,10 @@ class YOLOApp:
             st.session_state.detection_results = None
         if 'uploaded_image' not in st.session_state:
             st.session_state.uploaded_image = None
-        if 'model_loaded' not in st.session_state:
-            st.session_state.model_loaded = False
+        if 'uploaded_image_np' not in st.session_state:
+            st.session_state.uploaded_image_np = None
+        if 'uploaded_image_digest' not in st.session_state:
+            st.session_state.uploaded_image_digest = None
     
     def run(self):
         """アプリケーションを実行"""
@@ -93,12 +204,8 @@ class YOLOApp:
     
     def _display_header(self):
         """ヘッダーを表示"""
-        st.markdown("""
-        <div class="main-header">
-            <h1>🎯 YOLO物体検出アプリケーション</h1>
-            <p>リアルタイム物体検出と可視化ツール</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Streamlitはリランのたびに要素を描き直すため、表示自体は毎回行う
+        st.markdown(HEADER_HTML, unsafe_allow_html=True)
     
     def _display_sidebar(self):
         """サイドバーを表示"""
@@ -171,23 +278,26 @@ class YOLOApp:
         uploaded_file = self.image_upload.display_image_upload()
         
         if uploaded_file is not None:
-            # 画像をセッション状態に保存
-            st.session_state.uploaded_image = uploaded_file
+            # 画像が変わったときだけndarray化・ハッシュ計算を行い、セッション状態に保存
+            # （入力コンポーネントは入力元が同じ間は同じ画像オブジェクトを返すため、同一性で判定できる。
+            #  表示にはPIL画像、推論にはRGBのndarrayを使用する）
+            if st.session_state.uploaded_image is not uploaded_file:
+                image_array = np.asarray(uploaded_file.convert("RGB"))
+                st.session_state.uploaded_image = uploaded_file
+                st.session_state.uploaded_image_np = image_array
+                st.session_state.uploaded_image_digest = _image_digest(image_array)
             
             # 検出実行ボタン
             if st.button("🔍 検出を実行", type="primary"):
                 with st.spinner("検出中..."):
                     try:
-                        # モデルがロードされていない場合はロード
-                        if not st.session_state.model_loaded:
-                            self.model_manager.load_model()
-                            st.session_state.model_loaded = True
-                        
-                        # 検出実行
-                        results = self.model_manager.detect_objects(
-                            uploaded_file,
+                        # 検出実行（同一画像・同一条件の結果はキャッシュから取得）
+                        results = _cached_detect(
+                            st.session_state.uploaded_image_digest,
+                            st.session_state.uploaded_image_np,
                             confidence=st.session_state.confidence_threshold,
-                            nms_threshold=st.session_state.nms_threshold
+                            nms_threshold=st.session_state.nms_threshold,
+                            model_name=self.model_name
                         )
                         
                         # 結果をセッション状態に保存
@@ -196,6 +306,8 @@ class YOLOApp:
                         st.success("検出完了！")
                         
                     except Exception as e:
+                        # 前回の検出結果を今回の結果として表示しない
+                        st.session_state.detection_results = None
                         st.error(f"検出中にエラーが発生しました: {str(e)}")
             
             # 検出結果の表示
@@ -267,47 +379,41 @@ class YOLOApp:
         if results is None:
             return
         
-        # 基本統計
-        col1, col2, col3, col4 = st.columns(4)
+        boxes = getattr(results, 'boxes', None)
+        num_boxes = 0 if boxes is None else len(boxes)
         
-        with col1:
-            st.metric("検出物体数", len(results.boxes) if results.boxes is not None else 0)
-        
-        with col2:
-            if results.boxes is not None and len(results.boxes) > 0:
-                avg_confidence = float(results.boxes.conf.mean())
-                st.metric("平均信頼度", f"{avg_confidence:.3f}")
-            else:
-                st.metric("平均信頼度", "N/A")
+        if num_boxes == 0:
+            st.info("検出物体はありません")
+            return
         
-        with col3:
-            if results.boxes is not None and len(results.boxes) > 0:
-                max_confidence = float(results.boxes.conf.max())
-                st.metric("最大信頼度", f"{max_confidence:.3f}")
-            else:
-                st.metric("最大信頼度", "N/A")
+        # [x1, y1, x2, y2, 信頼度, クラスID]を一度だけCPUへ転送し（デバイス同期は1回）、
+        # 以降はNumPyで集計する
+        box_data = boxes.data.detach().cpu().numpy()
+        confidences = box_data[:, -2]
+        class_ids = box_data[:, -1].astype(np.int32)
         
-        with col4:
-            if results.boxes is not None and len(results.boxes) > 0:
-                min_confidence = float(results.boxes.conf.min())
-                st.metric("最小信頼度", f"{min_confidence:.3f}")
-            else:
-                st.metric("最小信頼度", "N/A")
+        # 基本統計
+        metric_labels = ["検出物体数", "平均信頼度", "最大信頼度", "最小信頼度"]
+        metric_values = [
+            num_boxes,
+            f"{confidences.mean():.3f}",
+            f"{confidences.max():.3f}",
+            f"{confidences.min():.3f}"
+        ]
+        for column, label, value in zip(st.columns(4), metric_labels, metric_values):
+            column.metric(label, value)
         
         # クラス別統計
-        if results.boxes is not None and len(results.boxes) > 0:
-            st.subheader("📊 クラス別検出統計")
-            
-            # クラス名と検出数を取得
-            class_counts = {}
-            for box in results.boxes:
-                class_id = int(box.cls[0])
-                class_name = results.names[class_id]
-                class_counts[class_name] = class_counts.get(class_name, 0) + 1
-            
-            # クラス別統計を表示
-            for class_name, count in sorted(class_counts.items(), key=lambda x: x[1], reverse=True):
-                st.markdown(f"**{class_name}**: {count}個検出")
+        st.subheader("📊 クラス別検出統計")
+        
+        # クラスIDごとの検出数を集計し、検出数の多い順に並べる
+        unique_ids, counts = np.unique(class_ids, return_counts=True)
+        order = np.argsort(-counts, kind="stable")
+        
+        # クラス別統計を表示
+        for index in order:
+            class_name = results.names[int(unique_ids[index])]
+            st.markdown(f"**{class_name}**: {counts[index]}個検出")
 
 def main():
     """メイン関数"""
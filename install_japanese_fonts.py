@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import platform
+import functools
 from pathlib import Path
 
 
@@ -105,15 +106,21 @@ def install_japanese_fonts_windows():
     return True
 
 
+@functools.lru_cache(maxsize=None)
+def get_available_font_names():
+    """利用可能なフォント名の集合を取得（フォント一覧の走査は一度だけ行う）"""
+    import matplotlib.font_manager as fm
+    
+    return frozenset(f.name for f in fm.fontManager.ttflist)
+
+
 def check_japanese_fonts():
     """日本語フォントの確認"""
     print("🔍 日本語フォントの確認中...")
     
     try:
-        import matplotlib.font_manager as fm
-        
         # 利用可能なフォントを取得
-        available_fonts = [f.name for f in fm.fontManager.ttflist]
+        available_fonts = get_available_font_names()
         
         # 日本語フォントのリスト
         japanese_fonts = [
@@ -128,10 +135,7 @@ def check_japanese_fonts():
             'VL PGothic'
         ]
         
-        found_fonts = []
-        for font in japanese_fonts:
-            if font in available_fonts:
-                found_fonts.append(font)
+        found_fonts = [font for font in japanese_fonts if font in available_fonts]
         
         if found_fonts:
             print(f"✅ 日本語フォントが見つかりました: {', '.join(found_fonts)}")
@@ -158,6 +162,7 @@ def main():
     # フォントのインストール
     if install_japanese_fonts():
         print("\n🔄 フォントキャッシュを更新中...")
+        get_available_font_names.cache_clear()
         
         # 再度フォントを確認
         if check_japanese_fonts():
@@ -0,0 +1,153 @@
+"""
+入力画像のデコード再利用と、検出結果キャッシュのキーのテスト
+"""
+
+import importlib
+import sys
+import types
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import app
+import ui_components
+
+
+@pytest.fixture
+def session_state(monkeypatch):
+    """Streamlitのランタイム無しで使えるセッション状態"""
+    state = {}
+    monkeypatch.setattr(ui_components.st, "session_state", state)
+    return state
+
+
+def test_image_digest_is_stable_for_equal_images():
+    image = np.random.default_rng(0).integers(0, 256, (8, 6, 3), dtype=np.uint8)
+    assert app._image_digest(image) == app._image_digest(image.copy())
+
+
+def test_image_digest_distinguishes_shape():
+    pixels = np.arange(24, dtype=np.uint8)
+    assert app._image_digest(pixels.reshape(2, 4, 3)) != app._image_digest(pixels.reshape(4, 2, 3))
+
+
+def test_image_digest_distinguishes_dtype():
+    unsigned = np.zeros((2, 2, 3), dtype=np.uint8)
+    signed = np.zeros((2, 2, 3), dtype=np.int8)
+    assert app._image_digest(unsigned) != app._image_digest(signed)
+
+
+def test_image_digest_accepts_non_contiguous_arrays():
+    image = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+    view = image[:, ::2]
+    assert app._image_digest(view) == app._image_digest(np.ascontiguousarray(view))
+
+
+def test_reuse_decoded_returns_same_image_for_same_source(session_state):
+    calls = []
+    
+    def load():
+        calls.append(None)
+        return Image.new("RGB", (4, 4))
+    
+    first = ui_components._reuse_decoded(("url", "https://example.com/a.jpg"), load)
+    second = ui_components._reuse_decoded(("url", "https://example.com/a.jpg"), load)
+    
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_reuse_decoded_reloads_when_source_changes(session_state):
+    first = ui_components._reuse_decoded(("camera", "file-1"), lambda: Image.new("RGB", (4, 4)))
+    second = ui_components._reuse_decoded(("camera", "file-2"), lambda: Image.new("RGB", (4, 4)))
+    
+    assert first is not second
+    assert session_state["decoded_image"] == (("camera", "file-2"), second)
+
+
+def test_reuse_decoded_keys_on_input_method(session_state):
+    upload = ui_components._reuse_decoded(("upload", "same-id"), lambda: Image.new("RGB", (4, 4)))
+    camera = ui_components._reuse_decoded(("camera", "same-id"), lambda: Image.new("RGB", (4, 4)))
+    
+    assert upload is not camera
+
+
+class FakeModelManager:
+    """モデルを読み込まないモデルマネージャー"""
+    
+    def load_model(self, model_name):
+        self.model_name = model_name
+        self.closed = False
+        return True
+    
+    def close(self):
+        self.closed = True
+
+
+def test_decode_falls_back_to_pillow_without_libturbojpeg(monkeypatch):
+    def missing_library():
+        raise RuntimeError("Unable to locate turbojpeg library automatically.")
+    
+    # PyTurboJPEGは導入済みだがlibjpeg-turbo本体が見つからない環境を再現する
+    fake_turbojpeg = types.ModuleType("turbojpeg")
+    fake_turbojpeg.TurboJPEG = missing_library
+    fake_turbojpeg.TJPF_RGB = 0
+    monkeypatch.setitem(sys.modules, "turbojpeg", fake_turbojpeg)
+    try:
+        module = importlib.reload(ui_components)
+        assert module._TURBO_JPEG is None
+        
+        buffer = BytesIO()
+        Image.new("RGB", (4, 3), (255, 0, 0)).save(buffer, format="JPEG")
+        decoded = module._decode_image(buffer.getvalue())
+        assert decoded.mode == "RGB"
+        assert decoded.size == (4, 3)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(ui_components)
+
+
+def test_release_model_keeps_other_models_cached(monkeypatch):
+    monkeypatch.setattr(app, "YOLOModelManager", FakeModelManager)
+    app._get_model_manager.clear()
+    
+    previous = app._get_model_manager("yolov8n.pt")
+    other = app._get_model_manager("yolov8s.pt")
+    
+    app._release_model("yolov8n.pt")
+    
+    assert previous.closed
+    assert not other.closed
+    assert app._get_model_manager("yolov8s.pt") is other
+    assert app._get_model_manager("yolov8n.pt") is not previous
+    app._get_model_manager.clear()
+
+
+class FlakyModelManager(FakeModelManager):
+    """1回目の検出だけ失敗するモデルマネージャー"""
+    
+    calls = 0
+    
+    def detect_objects(self, image, confidence=0.5, nms_threshold=0.4):
+        FlakyModelManager.calls += 1
+        return None if FlakyModelManager.calls == 1 else "results"
+
+
+def test_cached_detect_does_not_cache_failures(monkeypatch):
+    monkeypatch.setattr(app, "YOLOModelManager", FlakyModelManager)
+    monkeypatch.setattr(FlakyModelManager, "calls", 0)
+    app._get_model_manager.clear()
+    app._cached_detect.clear()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    digest = app._image_digest(image)
+    
+    with pytest.raises(RuntimeError):
+        app._cached_detect(digest, image, 0.5, 0.4, "yolov8n.pt")
+    assert app._cached_detect(digest, image, 0.5, 0.4, "yolov8n.pt") == "results"
+    assert app._cached_detect(digest, image, 0.5, 0.4, "yolov8n.pt") == "results"
+    assert FlakyModelManager.calls == 2
+    
+    app._cached_detect.clear()
+    app._get_model_manager.clear()
@@ -0,0 +1,262 @@
+"""
+推論バックエンドごとのrun_inference・検出処理のテスト
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+from ultralytics import YOLO
+
+from yolo_model_manager import (
+    DeepSparseYOLOAdapter,
+    StaticFrameState,
+    YOLODetectionProcessor,
+    YOLOModelLoader,
+    YOLOModelManager,
+)
+
+
+class StubPipeline:
+    """
+    DeepSparseのYOLOv8パイプラインと同じ入出力を持つテスト用パイプライン
+    
+    i番目の画像に対して、クラスID iの検出を1つ返します。
+    """
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, images, conf_thres, iou_thres):
+        self.calls.append(images)
+        return SimpleNamespace(
+            boxes=[[[1.0 + i, 2.0, 11.0 + i, 12.0]] for i in range(len(images))],
+            scores=[[0.9] for _ in images],
+            labels=[[str(float(i))] for i in range(len(images))]
+        )
+
+
+@pytest.fixture
+def pipeline():
+    return StubPipeline()
+
+
+@pytest.fixture
+def adapter(pipeline):
+    return DeepSparseYOLOAdapter(pipeline)
+
+
+@pytest.fixture(scope="module")
+def ultralytics_model():
+    # 重みのダウンロードを避けるため、構成ファイルから未学習のモデルを構築する
+    return YOLO("yolov8n.yaml")
+
+
+def _images(count):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def test_deepsparse_adapter_returns_one_result_per_image(adapter, pipeline):
+    results = adapter(_images(2))
+    
+    assert len(pipeline.calls) == 1
+    assert len(pipeline.calls[0]) == 2
+    assert len(results) == 2
+    assert [int(result.boxes.cls[0]) for result in results] == [0, 1]
+
+
+def test_deepsparse_adapter_single_image(adapter, pipeline):
+    results = adapter(_images(1)[0])
+    
+    assert len(pipeline.calls[0]) == 1
+    assert len(results) == 1
+    np.testing.assert_allclose(results[0].boxes.xyxy.numpy(), [[1.0, 2.0, 11.0, 12.0]])
+
+
+def test_deepsparse_adapter_accepts_normalized_batch_tensor(adapter, pipeline):
+    batch = torch.stack([torch.zeros(3, 32, 32), torch.ones(3, 32, 32)])
+    
+    results = adapter.predict(batch)
+    
+    images = pipeline.calls[0]
+    assert len(results) == 2
+    assert [image.shape for image in images] == [(32, 32, 3), (32, 32, 3)]
+    assert images[0].dtype == np.uint8
+    assert images[0].max() == 0 and images[1].min() == 255
+
+
+def test_deepsparse_adapter_stream_returns_iterator(adapter):
+    results = adapter.predict(_images(2), stream=True)
+    
+    assert next(results).boxes is not None
+    assert next(results).boxes is not None
+    assert next(results, None) is None
+
+
+@pytest.mark.parametrize("backend", ["ultralytics", "deepsparse"])
+def test_run_inference_single_image(backend, adapter, ultralytics_model):
+    model = adapter if backend == "deepsparse" else ultralytics_model
+    
+    result = YOLODetectionProcessor.run_inference(model, _images(1)[0])
+    
+    assert isinstance(result, dict)
+    assert result['boxes'].shape[1] == 4
+    assert len(result['scores']) == len(result['class_ids']) == len(result['labels'])
+
+
+@pytest.mark.parametrize("backend", ["ultralytics", "deepsparse"])
+def test_run_inference_batch(backend, adapter, ultralytics_model):
+    model = adapter if backend == "deepsparse" else ultralytics_model
+    
+    results = YOLODetectionProcessor.run_inference(model, _images(3))
+    
+    assert isinstance(results, list)
+    assert len(results) == 3
+    assert all(isinstance(result, dict) for result in results)
+
+
+def test_run_inference_deepsparse_keeps_per_image_results(adapter):
+    results = YOLODetectionProcessor.run_inference(adapter, _images(2))
+    
+    assert [result['class_ids'].tolist() for result in results] == [[0], [1]]
+    assert [result['class_names'].tolist() for result in results] == [['person'], ['bicycle']]
+
+
+def test_detect_objects_with_deepsparse_backend(adapter):
+    manager = YOLOModelManager()
+    manager.model = adapter
+    image = np.zeros((320, 640, 3), dtype=np.uint8)
+    
+    result = manager.detect_objects(image)
+    
+    assert result is not None
+    assert result.orig_shape == (320, 640)
+    # 640x640のレターボックス座標（上下に160pxの余白）から元画像の座標に戻される
+    np.testing.assert_allclose(result.boxes.xyxy.numpy(), [[1.0, 0.0, 11.0, 0.0]], atol=1e-4)
+
+
+def test_detect_objects_with_deepsparse_backend_stream(adapter):
+    manager = YOLOModelManager()
+    manager.model = adapter
+    
+    results = list(manager.detect_objects(_images(2), stream=True))
+    
+    assert len(results) == 2
+    assert all(result.orig_shape == (48, 64) for result in results)
+
+
+def test_static_frame_state_is_kept_per_caller(adapter, pipeline):
+    manager = YOLOModelManager()
+    manager.model = adapter
+    image = np.zeros((320, 640, 3), dtype=np.uint8)
+    first, second = StaticFrameState(), StaticFrameState()
+    
+    cached = manager.detect_objects(image, static_frame_state=first)
+    assert manager.detect_objects(image, static_frame_state=first) is cached
+    assert len(pipeline.calls) == 1
+    
+    # 別の呼び出し元の静止フレーム判定には、他の呼び出し元のフレームを使わない
+    assert manager.detect_objects(image, static_frame_state=second) is not cached
+    assert len(pipeline.calls) == 2
+
+
+def test_close_stops_batch_worker_after_pending_frames(adapter):
+    manager = YOLOModelManager()
+    manager.model = adapter
+    futures = [manager.detect_objects_async(image) for image in _images(3)]
+    worker = manager._batch_worker
+    
+    manager.close()
+    
+    # 停止前に投入したフレームはすべて推論される
+    assert all(future.result(timeout=10).orig_shape == (48, 64) for future in futures)
+    worker._thread.join(timeout=10)
+    assert not worker._thread.is_alive()
+    assert manager._batch_worker is None
+    
+    # 停止後の非同期推論では新しいワーカーが生成される
+    assert manager.detect_objects_async(_images(1)[0]).result(timeout=10) is not None
+    assert manager._batch_worker is not worker
+    manager.close()
+
+
+def test_deepsparse_adapter_survives_loader_warmup(adapter, pipeline):
+    YOLOModelLoader.fuse_model(adapter)
+    YOLOModelLoader.to_channels_last(adapter)
+    YOLOModelLoader.compile_model(adapter)
+    YOLOModelLoader.warmup_model(adapter)
+    
+    assert len(pipeline.calls) == YOLOModelLoader.WARMUP_ITERATIONS
+
+
+class FakeExportedModel:
+    """エクスポート済みモデルと同じく、predictだけを持つモデル"""
+    
+    def predict(self, *args, **kwargs):
+        return []
+
+
+def test_release_cached_model_only_evicts_that_model(monkeypatch):
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+    monkeypatch.setattr(
+        YOLOModelLoader, "_load_openvino_model",
+        staticmethod(lambda model_name: FakeExportedModel())
+    )
+    YOLOModelLoader.load_model.clear()
+    
+    previous = YOLOModelLoader.load_model("yolov8n.pt")
+    other = YOLOModelLoader.load_model("yolov8s.pt")
+    
+    YOLOModelLoader.release_cached_model("yolov8n.pt")
+    
+    assert YOLOModelLoader.load_model("yolov8s.pt") is other
+    assert YOLOModelLoader.load_model("yolov8n.pt") is not previous
+    YOLOModelLoader.load_model.clear()
+
+
+def test_compile_model_failure_leaves_model_usable(monkeypatch):
+    model = YOLO("yolov8n.yaml")
+    original = model.model
+    
+    def failing_compile(module, **kwargs):
+        raise TypeError("DetectionModel does not support len()")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(torch.cuda, "is_available", lambda: True)
+        patch.setattr(torch, "compile", failing_compile)
+        assert YOLOModelLoader.compile_model(model) is None
+    
+    assert model.model is original
+    assert len(model.predict(_images(1)[0], verbose=False)) == 1
+
+
+def test_compiled_module_runs_outside_ultralytics_predictor(monkeypatch):
+    model = YOLO("yolov8n.yaml")
+    original = model.model
+    eager_compile = torch.compile
+    cuda_available = torch.cuda.is_available
+    
+    with monkeypatch.context() as patch:
+        def compile_on_cpu(module, **kwargs):
+            # CPUでも実行できるよう、CUDAグラフを使わないバックエンドでコンパイルする
+            patch.setattr(torch.cuda, "is_available", cuda_available)
+            return eager_compile(module, backend="eager")
+        
+        patch.setattr(torch.cuda, "is_available", lambda: True)
+        patch.setattr(torch, "compile", compile_on_cpu)
+        compiled = YOLOModelLoader.compile_model(model)
+    
+    assert compiled is not None
+    # Ultralyticsの推論器はコンパイル済みモジュールを扱えないため、model.modelは置き換えない
+    assert model.model is original
+    assert len(model.predict(_images(1)[0], verbose=False)) == 1
+    
+    manager = YOLOModelManager()
+    manager.model = model
+    manager._compiled_module = compiled
+    result = manager.detect_objects(np.zeros((320, 640, 3), dtype=np.uint8))
+    
+    assert result is not None
+    assert result.orig_shape == (320, 640)
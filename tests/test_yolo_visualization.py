@@ -0,0 +1,39 @@
+"""
+可視化タブの図がキャンバス内に収まることのテスト
+"""
+
+import pytest
+
+from yolo_visualization import YOLOv8Visualizer
+
+BUILDERS = [
+    "create_processing_flow_diagram",
+    "create_architecture_diagram",
+    "create_detailed_comparison",
+]
+
+
+def _text_extents(fig):
+    """図中の全テキスト（枠付きの場合は枠）の描画範囲"""
+    renderer = fig.canvas.get_renderer()
+    for text in fig.findobj(lambda artist: hasattr(artist, "get_text") and artist.get_text()):
+        patch = text.get_bbox_patch()
+        artist = patch if patch is not None else text
+        yield text.get_text(), artist.get_window_extent(renderer)
+
+
+@pytest.mark.parametrize("builder_name", BUILDERS)
+def test_every_text_is_inside_the_canvas(builder_name):
+    fig = getattr(YOLOv8Visualizer, builder_name)()
+    fig.canvas.draw()
+    canvas = fig.bbox
+    
+    outside = [
+        text
+        for text, extent in _text_extents(fig)
+        if extent.x0 < canvas.x0 or extent.y0 < canvas.y0
+        or extent.x1 > canvas.x1 or extent.y1 > canvas.y1
+    ]
+    
+    assert outside == []
+
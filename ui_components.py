@@ -4,11 +4,102 @@ YOLOv8アプリケーションのUIコンポーネント
 """
 
 import streamlit as st
-from typing import Optional, Tuple
+import json
+import numpy as np
+from collections import Counter
+from typing import Callable, Optional, Tuple
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
 from io import BytesIO
 
+from yolo_model_manager import YOLOModelLoader, YOLODetectionProcessor
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _TURBO_JPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # PyTurboJPEGまたはlibjpeg-turboが無い環境ではPillowでデコードする
+    # （ライブラリ本体が見つからない場合、TurboJPEG()はRuntimeErrorを送出する）
+    _TURBO_JPEG = None
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+
+
+def _decode_image(data: bytes) -> Image.Image:
+    """
+    画像のバイト列をRGB画像にデコードします
+    
+    JPEGはPyTurboJPEGが利用可能であればSIMD最適化されたlibjpeg-turboで
+    ndarrayへ直接デコードし、それ以外の形式はPillowでデコードします。
+    
+    Args:
+        data: 画像ファイルのバイト列
+        
+    Returns:
+        RGBに変換済みの画像
+    """
+    if _TURBO_JPEG is not None and data[:3] == _JPEG_MAGIC:
+        return Image.fromarray(_TURBO_JPEG.decode(data, pixel_format=TJPF_RGB))
+    
+    image = Image.open(BytesIO(data)).convert("RGB")
+    image.load()
+    return image
+
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """
+    画像取得用のHTTPセッションを取得します（接続プールをリラン間で共有）
+    
+    Returns:
+        接続プール付きのHTTPセッション
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_image(url: str) -> Image.Image:
+    """
+    URLから画像を取得してデコードします（URLごとに結果をキャッシュ）
+    
+    Args:
+        url: 画像のURL
+        
+    Returns:
+        RGBに変換済みの画像
+    """
+    response = _http_session().get(url, timeout=10)
+    response.raise_for_status()
+    return _decode_image(response.content)
+
+
+def _reuse_decoded(source_id: Tuple[str, str], load: Callable[[], Image.Image]) -> Image.Image:
+    """
+    同じ入力元の画像はリランのたびに取得・デコードし直さず、セッション状態の画像を再利用します
+    
+    入力元が変わらない限り同じ画像オブジェクトを返すため、
+    呼び出し側は同一性の比較だけで画像の変化を判定できます。
+    
+    Args:
+        source_id: 入力元を識別するキー（(入力方法, アップロード・カメラはfile_id、URLはURL)）
+        load: 画像を取得・デコードする関数
+        
+    Returns:
+        RGBに変換済みの画像
+    """
+    decoded = st.session_state.get("decoded_image")
+    if decoded is not None and decoded[0] == source_id:
+        return decoded[1]
+    
+    image = load()
+    st.session_state["decoded_image"] = (source_id, image)
+    return image
+
 
 class YOLOUIComponents:
     """YOLOアプリケーションのUIコンポーネント管理クラス"""
@@ -83,13 +174,13 @@ class ModelSettingsComponent:
         """モデル設定UIを表示"""
         st.subheader("🔧 モデル設定")
         
-        from yolo_model_manager import YOLOModelLoader
         available_models = YOLOModelLoader.get_available_models()
         
         selected_model = st.selectbox(
             "YOLOv8モデルを選択",
             available_models,
             index=0,
+            key="selected_model",
             help="使用するYOLOv8モデルを選択してください"
         )
         
@@ -114,7 +205,6 @@ class SidebarManager:
         """
         st.sidebar.header("🔧 設定")
         
-        from yolo_model_manager import YOLOModelLoader
         available_models = YOLOModelLoader.get_available_models()
         
         selected_model = st.sidebar.selectbox(
@@ -251,9 +341,6 @@ class InputManager:
     @staticmethod
     def _load_sample_image() -> Optional[Image.Image]:
         """サンプル画像を読み込みます"""
-        import requests
-        from io import BytesIO
-        
         # サンプル画像の選択
         sample_images = {
             "オフィスシーン": "https://images.unsplash.com/photo-1497366216548-37526070297c?w=800&h=600&fit=crop",
@@ -273,10 +360,7 @@ class InputManager:
         if selected_image:
             try:
                 url = sample_images[selected_image]
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                image = Image.open(BytesIO(response.content))
-                return image
+                return _reuse_decoded(("url", url), lambda: _fetch_image(url))
             except Exception as e:
                 st.error(f"サンプル画像の読み込みに失敗しました: {e}")
                 return None
@@ -294,8 +378,10 @@ class InputManager:
         
         if uploaded_file is not None:
             try:
-                image = Image.open(uploaded_file)
-                return image
+                return _reuse_decoded(
+                    ("upload", uploaded_file.file_id),
+                    lambda: _decode_image(uploaded_file.getvalue())
+                )
             except Exception as e:
                 st.error(f"画像の読み込みに失敗しました: {e}")
                 return None
@@ -313,10 +399,8 @@ class InputManager:
         
         if url:
             try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                image = Image.open(BytesIO(response.content))
-                return image
+                # cache_dataは呼び出しごとに画像の複製を返すため、同じURLでは呼び出さない
+                return _reuse_decoded(("url", url), lambda: _fetch_image(url))
             except Exception as e:
                 st.error(f"URLからの画像読み込みに失敗しました: {e}")
                 return None
@@ -329,7 +413,10 @@ class InputManager:
         try:
             camera_input = st.camera_input("カメラで撮影")
             if camera_input is not None:
-                return Image.open(camera_input)
+                return _reuse_decoded(
+                    ("camera", camera_input.file_id),
+                    lambda: _decode_image(camera_input.getvalue())
+                )
             return None
         except Exception as e:
             st.error(f"カメラからの画像読み込みに失敗しました: {e}")
@@ -359,7 +446,7 @@ class ResultsManager:
         
         # 基本情報
         boxes = detection_result['boxes']
-        scores = detection_result['scores']
+        scores = np.asarray(detection_result['scores'])
         class_names = detection_result['class_names']
         
         col1, col2, col3 = st.columns(3)
@@ -367,7 +454,8 @@ class ResultsManager:
         with col1:
             st.metric("検出物体数", len(boxes))
         with col2:
-            st.metric("平均信頼度", f"{sum(scores)/len(scores):.3f}")
+            if len(scores) > 0:
+                st.metric("平均信頼度", f"{scores.mean():.3f}")
         with col3:
             if detection_result.get('inference_time'):
                 st.metric("推論時間", f"{detection_result['inference_time']:.1f}ms")
@@ -375,22 +463,33 @@ class ResultsManager:
         # 検出詳細
         if debug_mode:
             st.write("**📋 検出詳細:**")
-            for i, (box, score, class_name) in enumerate(zip(boxes, scores, class_names)):
-                x1, y1, x2, y2 = box
-                st.write(f"{i+1}. **{class_name}** (信頼度: {score:.3f}) - 座標: ({x1:.1f}, {y1:.1f}, {x2:.1f}, {y2:.1f})")
-        
-        # クラス別統計
-        unique_classes, counts = {}, {}
-        for class_name in class_names:
-            if class_name in unique_classes:
-                counts[class_name] += 1
-            else:
-                unique_classes[class_name] = len(unique_classes)
-                counts[class_name] = 1
+            # 1行ずつst.writeすると検出数分の描画メッセージが送られるため、1つの表にまとめる
+            rows = [
+                f"| {i+1} | {class_name} | {score:.3f} | ({x1:.1f}, {y1:.1f}, {x2:.1f}, {y2:.1f}) |"
+                for i, ((x1, y1, x2, y2), score, class_name)
+                in enumerate(zip(boxes, scores, class_names))
+            ]
+            st.markdown(
+                "| # | クラス | 信頼度 | 座標 |\n|---|---|---|---|\n" + "\n".join(rows)
+            )
+        
+        # クラス別統計（検出数の多い順）
+        class_counts = Counter(class_names)
         
         st.write("**🏷️ クラス別検出数:**")
-        for class_name, count in counts.items():
+        for class_name, count in class_counts.most_common():
             st.write(f"  - {class_name}: {count}個")
+        
+        # NumPy配列はダウンロード時にのみJSON用のリストへ変換する
+        st.download_button(
+            label="検出結果をJSONでダウンロード",
+            data=json.dumps(
+                YOLODetectionProcessor.to_jsonable(detection_result), ensure_ascii=False
+            ),
+            file_name="yolo_detection_result.json",
+            mime="application/json",
+            help="検出結果（座標・信頼度・クラス）をJSON形式でダウンロード"
+        )
     
     @staticmethod
     def create_download_section(visualized_image: Image.Image) -> None:
@@ -5,53 +5,448 @@ YOLOv8モデルの管理を担当するモジュール
 
 import streamlit as st
 import torch
+import cv2
 from ultralytics import YOLO
+from ultralytics.engine.results import Results
+from ultralytics.utils import ops
+try:
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:  # ultralytics < 8.3.x ではopsに含まれる
+    from ultralytics.utils.ops import non_max_suppression
 from PIL import Image
 import numpy as np
-from typing import Optional, List, Dict, Any, Tuple
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple, Union
+import contextlib
+import gc
+import logging
+import queue
+import shutil
+import threading
 import time
 
 
+logger = logging.getLogger(__name__)
+
+# 入力サイズは640x640固定のため、cuDNNに最速の畳み込みアルゴリズムを選ばせる
+torch.backends.cudnn.benchmark = True
+
+
+# 推論時に捕捉する例外（GPUメモリ不足、推論エンジンの実行時エラー、モデルファイルの欠落）
+_INFERENCE_ERRORS = (torch.cuda.OutOfMemoryError, RuntimeError, FileNotFoundError)
+
+
+def _report_inference_error(error: Exception, message: str) -> None:
+    """
+    推論時の例外を表示します
+    
+    GPUメモリ不足の場合は、キャッシュされた未使用メモリを解放してから表示します。
+    
+    Args:
+        error: 捕捉した例外
+        message: 表示するメッセージ
+    """
+    if isinstance(error, torch.cuda.OutOfMemoryError):
+        torch.cuda.empty_cache()
+        st.error(f"{message}（GPUメモリが不足しています）: {error}")
+    else:
+        st.error(f"{message}: {error}")
+
+
+def _autocast_context():
+    """
+    推論用の自動混合精度コンテキストを取得します
+    
+    Returns:
+        CUDAが利用可能な場合はFP16のautocast、それ以外は何もしないコンテキスト
+    """
+    if torch.cuda.is_available():
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+
+# 利用可能なモデル名（呼び出しごとにリテラルを再構築しないようモジュール定数にする）
+_AVAILABLE_MODELS: Tuple[str, ...] = (
+    "yolov8n.pt",  # nano
+    "yolov8s.pt",  # small
+    "yolov8m.pt",  # medium
+    "yolov8l.pt",  # large
+    "yolov8x.pt"   # xlarge
+)
+
+# モデルごとの詳細情報
+_MODEL_INFO: Dict[str, Dict[str, Any]] = {
+    "yolov8n.pt": {
+        "name": "YOLOv8 Nano",
+        "parameters": "3.2M",
+        "size": "6.3MB",
+        "mAP50": "0.637",
+        "mAP50-95": "0.454",
+        "speed_gpu": "8.7ms",
+        "speed_cpu": "23.4ms",
+        "description": "軽量で高速、エッジデバイス向け"
+    },
+    "yolov8s.pt": {
+        "name": "YOLOv8 Small",
+        "parameters": "11.2M",
+        "size": "22.6MB",
+        "mAP50": "0.718",
+        "mAP50-95": "0.554",
+        "speed_gpu": "12.9ms",
+        "speed_cpu": "35.2ms",
+        "description": "バランス型、一般的な用途"
+    },
+    "yolov8m.pt": {
+        "name": "YOLOv8 Medium",
+        "parameters": "25.9M",
+        "size": "52.2MB",
+        "mAP50": "0.764",
+        "mAP50-95": "0.628",
+        "speed_gpu": "22.6ms",
+        "speed_cpu": "61.8ms",
+        "description": "高精度、サーバー向け"
+    },
+    "yolov8l.pt": {
+        "name": "YOLOv8 Large",
+        "parameters": "43.7M",
+        "size": "87.7MB",
+        "mAP50": "0.792",
+        "mAP50-95": "0.671",
+        "speed_gpu": "31.2ms",
+        "speed_cpu": "85.4ms",
+        "description": "最高精度、研究用途"
+    },
+    "yolov8x.pt": {
+        "name": "YOLOv8 XLarge",
+        "parameters": "68.2M",
+        "size": "136.6MB",
+        "mAP50": "0.814",
+        "mAP50-95": "0.699",
+        "speed_gpu": "35.7ms",
+        "speed_cpu": "98.1ms",
+        "description": "最大精度、特殊用途"
+    }
+}
+
+# COCOデータセットのクラス名
+_COCO_CLASSES: Tuple[str, ...] = (
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat',
+    'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat',
+    'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 'backpack',
+    'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball',
+    'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket',
+    'bottle', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
+    'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake',
+    'chair', 'couch', 'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop',
+    'mouse', 'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
+    'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier', 'toothbrush'
+)
+
+
 class YOLOModelLoader:
     """YOLOv8モデルの読み込みを担当するクラス"""
     
     DEFAULT_MODEL_NAME = "yolov8n.pt"
+    INPUT_SIZE = 640
+    MAX_BATCH_SIZE = 8
+    CACHE_DIR = Path.home() / ".cache" / "yolo_app"
+    INT8_CALIBRATION_DATA = "coco128.yaml"
+    WARMUP_ITERATIONS = 2
     
     @staticmethod
     @st.cache_resource
-    def load_model(model_name: str = DEFAULT_MODEL_NAME) -> Optional[YOLO]:
+    def load_model(
+        model_name: str = DEFAULT_MODEL_NAME,
+        int8: bool = False,
+        backend: str = "auto"
+    ) -> Optional[YOLO]:
         """
         YOLOv8モデルを読み込みます
         
+        CUDAが利用可能な場合はTensorRTエンジン、それ以外はOpenVINOモデルを使用します。
+        backend="deepsparse"を指定するとCPU向けのDeepSparseパイプラインを使用します。
+        
         Args:
             model_name: モデル名
+            int8: TensorRTエンジンをINT8量子化でビルドするかどうか
+            backend: 推論バックエンド（"auto" または "deepsparse"）
             
         Returns:
             読み込まれたモデル、失敗時はNone
         """
         try:
             with st.spinner(f"YOLOv8モデル '{model_name}' を読み込み中..."):
-                model = YOLO(model_name)
+                if backend == "deepsparse":
+                    model = YOLOModelLoader._load_deepsparse_model(model_name)
+                elif torch.cuda.is_available():
+                    model = YOLOModelLoader._load_tensorrt_model(model_name, int8=int8)
+                else:
+                    model = YOLOModelLoader._load_openvino_model(model_name)
+                YOLOModelLoader.fuse_model(model)
+                YOLOModelLoader.to_channels_last(model)
+                YOLOModelLoader.warmup_model(model)
                 return model
         except Exception as e:
             st.error(f"モデルの読み込みに失敗しました: {e}")
             return None
     
     @staticmethod
-    def get_available_models() -> List[str]:
+    def _load_tensorrt_model(model_name: str, int8: bool = False) -> YOLO:
+        """
+        GPU推論用にTensorRTエンジンへエクスポートしたモデルを読み込みます
+        
+        エンジンは動的バッチ（最大MAX_BATCH_SIZE）のFP16、またはINT8でビルドし、
+        キャッシュディレクトリに保存して2回目以降は再利用します。
+        エクスポートに失敗した場合はPyTorchモデルをそのまま使用します。
+        
+        Args:
+            model_name: モデル名
+            int8: INT8量子化でビルドするかどうか
+            
+        Returns:
+            読み込まれたモデル
+        """
+        precision = "int8" if int8 else "fp16"
+        engine_path = YOLOModelLoader.CACHE_DIR / f"{Path(model_name).stem}_{precision}.engine"
+        
+        if not engine_path.exists():
+            export_args = dict(
+                format="engine",
+                half=not int8,
+                int8=int8,
+                dynamic=True,
+                batch=YOLOModelLoader.MAX_BATCH_SIZE,
+                imgsz=YOLOModelLoader.INPUT_SIZE,
+                workspace=4
+            )
+            if int8:
+                export_args["data"] = YOLOModelLoader.INT8_CALIBRATION_DATA
+            
+            try:
+                exported_path = YOLO(model_name).export(**export_args)
+                engine_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(exported_path), str(engine_path))
+            except Exception as e:
+                st.warning(f"TensorRTへのエクスポートに失敗したため、PyTorchモデルを使用します: {e}")
+                return YOLO(model_name)
+        
+        return YOLO(str(engine_path), task="detect")
+    
+    @staticmethod
+    def _load_openvino_model(model_name: str) -> YOLO:
+        """
+        CPU推論用にOpenVINO形式へエクスポートしたモデルを読み込みます
+        
+        エクスポート結果はキャッシュディレクトリに保存し、2回目以降は再利用します。
+        エクスポートに失敗した場合はPyTorchモデルをそのまま使用します。
+        
+        Args:
+            model_name: モデル名
+            
+        Returns:
+            読み込まれたモデル
+        """
+        export_dir = YOLOModelLoader.CACHE_DIR / f"{Path(model_name).stem}_fp16_openvino_model"
+        
+        if not export_dir.exists():
+            try:
+                exported_path = YOLO(model_name).export(
+                    format="openvino",
+                    half=True,
+                    imgsz=YOLOModelLoader.INPUT_SIZE
+                )
+                export_dir.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(exported_path), str(export_dir))
+            except Exception as e:
+                st.warning(f"OpenVINOへのエクスポートに失敗したため、PyTorchモデルを使用します: {e}")
+                return YOLO(model_name)
+        
+        return YOLO(str(export_dir), task="detect")
+    
+    @staticmethod
+    def _load_deepsparse_model(model_name: str) -> "DeepSparseYOLOAdapter":
+        """
+        ONNXへエクスポートしたモデルをDeepSparseのYOLOv8パイプラインで読み込みます
+        
+        Args:
+            model_name: モデル名
+            
+        Returns:
+            Ultralyticsの結果形式で推論結果を返すアダプター
+        """
+        from deepsparse import Pipeline
+        
+        onnx_path = YOLOModelLoader.CACHE_DIR / f"{Path(model_name).stem}.onnx"
+        
+        if not onnx_path.exists():
+            exported_path = YOLO(model_name).export(
+                format="onnx",
+                imgsz=YOLOModelLoader.INPUT_SIZE
+            )
+            onnx_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(exported_path), str(onnx_path))
+        
+        pipeline = Pipeline.create(task="yolov8", model_path=str(onnx_path))
+        return DeepSparseYOLOAdapter(pipeline)
+    
+    @staticmethod
+    def fuse_model(model: YOLO) -> None:
+        """
+        Conv層とBatchNorm層を融合して重みを凍結し、推論時の演算数とメモリアクセスを削減します
+        
+        PyTorchモデル以外（OpenVINOなどのエクスポート済みモデル）は対象外です。
+        
+        Args:
+            model: YOLOv8モデル
+        """
+        if not isinstance(getattr(model, "model", None), torch.nn.Module):
+            return
+        
+        model.fuse()
+        
+        # 推論専用のため重みを凍結し、autogradの追跡対象から外す
+        model.model.eval()
+        model.model.requires_grad_(False)
+        
+        num_params = sum(p.numel() for p in model.model.parameters())
+        num_layers = len(list(model.model.modules()))
+        logger.info("Fused Conv+BN layers: %d modules, %d parameters", num_layers, num_params)
+    
+    @staticmethod
+    def uses_channels_last(model) -> bool:
+        """
+        モデルをchannels_last（NHWC）形式で実行するかどうかを判定します
+        
+        cuDNNのFP16畳み込みカーネルはNHWCを前提とするため、GPU上のPyTorchモデルでのみ使用します。
+        
+        Args:
+            model: YOLOv8モデル
+            
+        Returns:
+            CUDAが利用可能で、PyTorchモデルの場合はTrue
+        """
+        return torch.cuda.is_available() and isinstance(getattr(model, "model", None), torch.nn.Module)
+    
+    @staticmethod
+    def to_channels_last(model: YOLO) -> None:
+        """
+        GPU上のPyTorchモデルの重みをchannels_last形式に変換します
+        
+        畳み込みごとのNCHW⇔NHWCの内部転置を避けられます。
+        FP16化は推論時のhalf指定でUltralyticsが行います。
+        
+        Args:
+            model: YOLOv8モデル
+        """
+        if not YOLOModelLoader.uses_channels_last(model):
+            return
+        
+        model.model.to(memory_format=torch.channels_last)
+    
+    @staticmethod
+    def compile_model(model: YOLO) -> Optional[torch.nn.Module]:
+        """
+        TensorRTを使用しないGPU上のPyTorchモデルの順伝播をtorch.compileでコンパイルします
+        
+        カーネル融合とCUDAグラフによる起動オーバーヘッド削減（mode="reduce-overhead"）を行います。
+        Ultralyticsの推論器はコンパイル済みモジュールを扱えないため、model.modelは置き換えず、
+        コンパイル済みモジュールを別に返します（推論はYOLO.predictを経由せずに直接実行する）。
+        ウォームアップで重みがGPUへ移動・FP16化された後に呼び出す必要があります。
+        
+        Args:
+            model: YOLOv8モデル
+            
+        Returns:
+            コンパイル済みのモジュール、対象外またはコンパイルに失敗した場合はNone
+        """
+        if not hasattr(torch, "compile"):
+            return None
+        module = getattr(model, "model", None)
+        if not torch.cuda.is_available() or not isinstance(module, torch.nn.Module):
+            return None
+        
+        size = YOLOModelLoader.INPUT_SIZE
+        parameter = next(module.parameters())
+        dummy_input = torch.zeros(
+            (1, 3, size, size), device=parameter.device, dtype=parameter.dtype
+        )
+        if YOLOModelLoader.uses_channels_last(model):
+            dummy_input = dummy_input.contiguous(memory_format=torch.channels_last)
+        
+        try:
+            compiled = torch.compile(module.eval(), mode="reduce-overhead", fullgraph=False)
+            # コンパイルは最初の順伝播で行われるため、ここで失敗を検出する
+            with torch.inference_mode():
+                for _ in range(YOLOModelLoader.WARMUP_ITERATIONS):
+                    compiled(dummy_input)
+        except Exception as e:
+            logger.warning("torch.compile failed, using the eager model: %s", e)
+            return None
+        return compiled
+    
+    @staticmethod
+    def warmup_model(model: YOLO) -> None:
+        """
+        ダミー画像で1回推論し、初回推論時のオーバーヘッドを読み込み時に済ませます
+        
+        CUDAコンテキストの初期化、cuDNNのアルゴリズム探索、カーネルのJITは
+        最初の推論でのみ発生するため、ここで実行しておくことで
+        ユーザー操作時の推論は常に定常状態のレイテンシーになります。
+        
+        Args:
+            model: YOLOv8モデル
+        """
+        size = YOLOModelLoader.INPUT_SIZE
+        dummy_image = np.zeros((size, size, 3), dtype=np.uint8)
+        # 1回目で推論器の構築とCUDAコンテキストの初期化、2回目以降でcuDNNの探索結果を確定させる
+        with torch.inference_mode():
+            for _ in range(YOLOModelLoader.WARMUP_ITERATIONS):
+                model.predict(
+                    dummy_image,
+                    half=YOLOModelLoader.use_half_precision(),
+                    verbose=False
+                )
+    
+    @staticmethod
+    def release_cached_model(model_name: str) -> None:
+        """
+        指定したモデルのキャッシュだけを破棄し、GPUメモリを解放します
+        
+        st.cache_resourceがモデルを保持し続けるため、モデル切り替え時に呼び出します。
+        キャッシュは全セッションで共有されるため、他のモデルのエントリーには触れません。
+        
+        Args:
+            model_name: 破棄するモデル名（load_modelと同じく位置引数で渡したキー）
+        """
+        YOLOModelLoader.load_model.clear(model_name)
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            torch.cuda.ipc_collect()
+    
+    @staticmethod
+    def use_half_precision() -> bool:
+        """
+        半精度(FP16)推論を使用するかどうかを判定します
+        
+        Ultralyticsの推論バックエンドは最初の推論時の設定で構築されるため、
+        ウォームアップと検出で同じ値を使用する必要があります。
+        
+        Returns:
+            CUDAが利用可能な場合はTrue
+        """
+        return torch.cuda.is_available()
+    
+    @staticmethod
+    def get_available_models() -> Tuple[str, ...]:
         """
         利用可能なモデルのリストを取得します
         
         Returns:
-            利用可能なモデル名のリスト
+            利用可能なモデル名のタプル（共有の定数のため変更しないこと）
         """
-        return [
-            "yolov8n.pt",  # nano
-            "yolov8s.pt",  # small
-            "yolov8m.pt",  # medium
-            "yolov8l.pt",  # large
-            "yolov8x.pt"   # xlarge
-        ]
+        return _AVAILABLE_MODELS
     
     @staticmethod
     def get_model_info(model_name: str) -> Dict[str, Any]:
@@ -62,83 +457,149 @@ class YOLOModelLoader:
             model_name: モデル名
             
         Returns:
-            モデルの詳細情報
-        """
-        model_info = {
-            "yolov8n.pt": {
-                "name": "YOLOv8 Nano",
-                "parameters": "3.2M",
-                "size": "6.3MB",
-                "mAP50": "0.637",
-                "mAP50-95": "0.454",
-                "speed_gpu": "8.7ms",
-                "speed_cpu": "23.4ms",
-                "description": "軽量で高速、エッジデバイス向け"
-            },
-            "yolov8s.pt": {
-                "name": "YOLOv8 Small",
-                "parameters": "11.2M",
-                "size": "22.6MB",
-                "mAP50": "0.718",
-                "mAP50-95": "0.554",
-                "speed_gpu": "12.9ms",
-                "speed_cpu": "35.2ms",
-                "description": "バランス型、一般的な用途"
-            },
-            "yolov8m.pt": {
-                "name": "YOLOv8 Medium",
-                "parameters": "25.9M",
-                "size": "52.2MB",
-                "mAP50": "0.764",
-                "mAP50-95": "0.628",
-                "speed_gpu": "22.6ms",
-                "speed_cpu": "61.8ms",
-                "description": "高精度、サーバー向け"
-            },
-            "yolov8l.pt": {
-                "name": "YOLOv8 Large",
-                "parameters": "43.7M",
-                "size": "87.7MB",
-                "mAP50": "0.792",
-                "mAP50-95": "0.671",
-                "speed_gpu": "31.2ms",
-                "speed_cpu": "85.4ms",
-                "description": "最高精度、研究用途"
-            },
-            "yolov8x.pt": {
-                "name": "YOLOv8 XLarge",
-                "parameters": "68.2M",
-                "size": "136.6MB",
-                "mAP50": "0.814",
-                "mAP50-95": "0.699",
-                "speed_gpu": "35.7ms",
-                "speed_cpu": "98.1ms",
-                "description": "最大精度、特殊用途"
-            }
-        }
-        
-        return model_info.get(model_name, {})
+            モデルの詳細情報（共有の定数のため変更しないこと）
+        """
+        return _MODEL_INFO.get(model_name, {})
     
     @staticmethod
-    def get_coco_classes() -> List[str]:
+    def get_coco_classes() -> Tuple[str, ...]:
         """
         COCOデータセットのクラス名を取得します
         
         Returns:
-            COCOクラス名のリスト
+            COCOクラス名のタプル
         """
-        return [
-            'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat',
-            'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat',
-            'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 'backpack',
-            'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball',
-            'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket',
-            'bottle', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
-            'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake',
-            'chair', 'couch', 'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop',
-            'mouse', 'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
-            'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier', 'toothbrush'
+        return _COCO_CLASSES
+
+
+# クラスIDからクラス名をベクトル化して引くための配列
+# （object配列のため要素は_COCO_CLASSESの文字列そのもので、参照のたびに文字列を生成しない）
+_COCO_CLASS_ARRAY = np.array(_COCO_CLASSES, dtype=object)
+# 全クラス・全セッションで共有するため読み取り専用にする
+_COCO_CLASS_ARRAY.setflags(write=False)
+
+# 可視化用の色（OpenCVで描画するためBGR順）
+_COLORS_BGR = np.array([
+    (0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255), (255, 0, 255),
+    (255, 255, 0), (0, 165, 255), (128, 0, 128), (0, 128, 0), (0, 0, 128)
+], dtype=np.uint8)
+
+# クラスIDごとの描画色（ボックスごとの剰余計算・タプル変換を省くため事前計算）
+_COLORS_BY_CLS: Tuple[Tuple[int, int, int], ...] = tuple(
+    tuple(int(c) for c in _COLORS_BGR[class_id % len(_COLORS_BGR)])
+    for class_id in range(len(_COCO_CLASS_ARRAY))
+)
+
+# ラベル描画用のフォント設定
+_FONT_FACE = cv2.FONT_HERSHEY_SIMPLEX
+_FONT_SCALE = 0.5
+_FONT_THICKNESS = 1
+
+# ラベル文字列ごとのcv2.getTextSizeの結果
+_TEXT_SIZE_CACHE: Dict[str, Tuple[Tuple[int, int], int]] = {}
+
+
+class DeepSparseYOLOAdapter:
+    """DeepSparseのYOLOv8パイプラインをUltralyticsの結果形式で呼び出すアダプター"""
+    
+    def __init__(self, pipeline):
+        """
+        アダプターの初期化
+        
+        Args:
+            pipeline: DeepSparseのYOLOv8パイプライン
+        """
+        self.pipeline = pipeline
+        self.names = dict(enumerate(_COCO_CLASSES))
+    
+    def __call__(
+        self,
+        source,
+        conf: float = 0.25,
+        iou: float = 0.45,
+        stream: bool = False,
+        **kwargs
+    ):
+        """
+        推論を実行します
+        
+        複数画像（リストやバッチテンソル）は1回のパイプライン呼び出しでまとめて処理し、
+        画像ごとに1つの結果を返します。
+        
+        Args:
+            source: 入力画像、入力画像のリスト、または前処理済みのBCHWテンソル
+            conf: 信頼度閾値
+            iou: IoU閾値
+            stream: Trueの場合、結果のリストの代わりにイテレーターを返す（YOLO.predictと同じ）
+            
+        Returns:
+            画像ごとのUltralyticsの推論結果のリスト（stream=Trueの場合はそのイテレーター）
+        """
+        images = self._to_images(source)
+        output = self.pipeline(images=images, conf_thres=conf, iou_thres=iou)
+        
+        results = [
+            self._to_result(image, boxes, scores, labels)
+            for image, boxes, scores, labels in zip(
+                images, output.boxes, output.scores, output.labels
+            )
         ]
+        return iter(results) if stream else results
+    
+    def predict(self, source, **kwargs):
+        """推論を実行します（YOLO.predictと同じ呼び出し方に対応）"""
+        return self(source, **kwargs)
+    
+    @staticmethod
+    def _to_images(source) -> List[np.ndarray]:
+        """
+        入力を画像ごとのRGBのuint8配列のリストに変換します
+        
+        Args:
+            source: PIL画像、RGBのndarray、値域0〜1の(B)CHWテンソル、またはそれらのリスト
+            
+        Returns:
+            RGBのndarray (H, W, 3) のリスト
+        """
+        if isinstance(source, (list, tuple)):
+            return [
+                image
+                for item in source
+                for image in DeepSparseYOLOAdapter._to_images(item)
+            ]
+        if isinstance(source, torch.Tensor):
+            # YOLOModelManagerの前処理済みテンソル（正規化済み）を画素値に戻す
+            batch = source if source.dim() == 4 else source[None]
+            batch = (batch.float().clamp(0, 1) * 255).round().to(torch.uint8)
+            return list(batch.permute(0, 2, 3, 1).contiguous().cpu().numpy())
+        if isinstance(source, Image.Image):
+            return [np.asarray(source.convert("RGB"))]
+        
+        source = np.asarray(source)
+        return list(source) if source.ndim == 4 else [source]
+    
+    def _to_result(self, image: np.ndarray, boxes, scores, labels) -> Results:
+        """
+        パイプラインの1画像分の出力をUltralyticsの推論結果に変換します
+        
+        Args:
+            image: 入力画像 (RGB)
+            boxes: [x1, y1, x2, y2] のリスト
+            scores: 信頼度のリスト
+            labels: クラスIDのリスト
+            
+        Returns:
+            boxesに[x1, y1, x2, y2, 信頼度, クラスID]を持つ推論結果
+        """
+        data = torch.cat([
+            torch.as_tensor(np.asarray(boxes, dtype=np.float32).reshape(-1, 4)),
+            torch.as_tensor(np.asarray(scores, dtype=np.float32).reshape(-1, 1)),
+            torch.tensor([float(label) for label in labels], dtype=torch.float32).reshape(-1, 1)
+        ], dim=1)
+        # Ultralyticsの結果オブジェクトは元画像をBGRで保持する
+        return Results(
+            np.ascontiguousarray(image[..., ::-1]), path="", names=self.names, boxes=data
+        )
 
 
 class YOLODetectionProcessor:
@@ -147,93 +608,195 @@ class YOLODetectionProcessor:
     @staticmethod
     def run_inference(
         model: YOLO,
-        image: Image.Image,
+        image: Union[Image.Image, List[Image.Image]],
         confidence_threshold: float = 0.25,
         iou_threshold: float = 0.45,
         debug_mode: bool = False
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Union[Optional[Dict[str, Any]], List[Optional[Dict[str, Any]]]]:
         """
         YOLOv8推論を実行します
         
+        画像のリストを渡した場合は1回の推論でまとめて処理します（バッチ推論）。
+        
         Args:
             model: YOLOv8モデル
-            image: 入力画像
+            image: 入力画像、または入力画像のリスト
             confidence_threshold: 信頼度閾値
             iou_threshold: IoU閾値
             debug_mode: デバッグモード
             
         Returns:
-            推論結果、失敗時はNone
+            推論結果、失敗時はNone（リストを渡した場合は画像ごとの推論結果のリスト）
         """
-        try:
-            if debug_mode:
-                st.write("**🚀 YOLOv8推論実行中...**")
-                start_time = time.time()
-            
-            # 推論実行
-            results = model(
-                image,
-                conf=confidence_threshold,
-                iou=iou_threshold,
-                verbose=False
-            )
-            
-            if debug_mode:
-                end_time = time.time()
-                inference_time = (end_time - start_time) * 1000  # ms
-                st.write(f"✅ 推論完了 (処理時間: {inference_time:.2f}ms)")
-            
-            # 結果の解析
-            if results and len(results) > 0:
-                result = results[0]  # 最初の結果を使用
-                
-                # 検出結果の取得
-                boxes = result.boxes
-                if boxes is not None:
-                    # バウンディングボックス、信頼度、クラスIDを取得
-                    bbox_data = boxes.xyxy.cpu().numpy()  # [x1, y1, x2, y2]
-                    confidence_scores = boxes.conf.cpu().numpy()
-                    class_ids = boxes.cls.cpu().numpy().astype(int)
-                    
-                    # クラス名を取得
-                    coco_classes = YOLOModelLoader.get_coco_classes()
-                    class_names = [coco_classes[class_id] for class_id in class_ids]
-                    
-                    detection_result = {
-                        'boxes': bbox_data.tolist(),
-                        'scores': confidence_scores.tolist(),
-                        'class_ids': class_ids.tolist(),
-                        'class_names': class_names,
-                        'inference_time': inference_time if debug_mode else None
-                    }
-                    
-                    if debug_mode:
-                        st.write(f"**📊 検出結果:**")
-                        st.write(f"- 検出された物体数: {len(bbox_data)}")
-                        st.write(f"- 平均信頼度: {np.mean(confidence_scores):.3f}")
-                        st.write(f"- 最高信頼度: {np.max(confidence_scores):.3f}")
-                        
-                        # クラス別の検出数
-                        unique_classes, counts = np.unique(class_names, return_counts=True)
-                        st.write("**🏷️ クラス別検出数:**")
-                        for class_name, count in zip(unique_classes, counts):
-                            st.write(f"  - {class_name}: {count}個")
-                    
-                    return detection_result
-                else:
-                    if debug_mode:
-                        st.warning("検出された物体がありません")
-                    return None
-            else:
+        is_batch = isinstance(image, (list, tuple))
+        images = list(image) if is_batch else [image]
+        
+        if debug_mode:
+            st.write("**🚀 YOLOv8推論実行中...**")
+            start_time = time.time()
+        
+        # 推論実行（GPUではFP16のTensor Coreを使用）
+        with torch.inference_mode(), _autocast_context():
+            try:
+                results = model(
+                    images,
+                    conf=confidence_threshold,
+                    iou=iou_threshold,
+                    verbose=False
+                )
+            except _INFERENCE_ERRORS as e:
+                _report_inference_error(e, "推論の実行に失敗しました")
                 if debug_mode:
-                    st.warning("推論結果が空です")
+                    st.write(f"エラーの詳細: {str(e)}")
                 return None
-                
-        except Exception as e:
-            st.error(f"推論の実行に失敗しました: {e}")
+        
+        inference_time = None
+        if debug_mode:
+            end_time = time.time()
+            inference_time = (end_time - start_time) * 1000 / len(images)  # ms/枚
+            st.write(f"✅ 推論完了 (処理時間: {inference_time:.2f}ms/枚)")
+        
+        # 結果の解析
+        if not results:
             if debug_mode:
-                st.write(f"エラーの詳細: {str(e)}")
+                st.warning("推論結果が空です")
+            return [] if is_batch else None
+        
+        detection_results = [
+            YOLODetectionProcessor._parse_result(result, inference_time)
+            for result in results
+        ]
+        
+        if debug_mode:
+            for detection_result in detection_results:
+                if detection_result is None:
+                    st.warning("検出された物体がありません")
+                else:
+                    YOLODetectionProcessor._display_debug_summary(detection_result)
+        
+        return detection_results if is_batch else detection_results[0]
+    
+    @staticmethod
+    def _parse_result(result, inference_time: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        1枚分の推論結果を検出結果の辞書に変換します
+        
+        Args:
+            result: Ultralyticsの推論結果
+            inference_time: 1枚あたりの推論時間 (ms)
+            
+        Returns:
+            検出結果、検出ボックスが無い場合はNone
+        """
+        boxes = result.boxes
+        if boxes is None:
             return None
+        
+        # [x1, y1, x2, y2, 信頼度, クラスID]をデバイス上で連結し、CPUへの転送を1回にまとめる
+        data = torch.cat(
+            [boxes.xyxy, boxes.conf[:, None], boxes.cls[:, None]], dim=1
+        ).cpu().numpy()
+        
+        # FP16推論の出力もfloat32にそろえ、以降はNumPy配列のまま受け渡す
+        data = data.astype(np.float32, copy=False)
+        bbox_data = data[:, :4]
+        confidence_scores = data[:, 4]
+        class_ids = data[:, 5].astype(np.int32)
+        
+        # クラス名はNumPyのインデックス参照でまとめて取得
+        class_names = _COCO_CLASS_ARRAY[class_ids]
+        
+        return {
+            'boxes': bbox_data,
+            'scores': confidence_scores,
+            'class_ids': class_ids,
+            'class_names': class_names,
+            'inference_time': inference_time,
+            'stats': YOLODetectionProcessor.compute_stats(confidence_scores, class_ids),
+            # 再描画のたびに書式化しないよう、ラベル文字列を結果と一緒に保持する
+            'labels': [
+                f"{class_name}: {score:.2f}"
+                for class_name, score in zip(class_names, confidence_scores.tolist())
+            ]
+        }
+    
+    @staticmethod
+    def to_jsonable(detection_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        検出結果をJSONにシリアライズ可能な辞書に変換します
+        
+        検出結果はNumPy配列のまま受け渡し、ダウンロードなどの境界でのみ変換します。
+        
+        Args:
+            detection_result: 検出結果
+            
+        Returns:
+            配列をリストに変換した検出結果
+        """
+        return {
+            'boxes': np.asarray(detection_result['boxes']).tolist(),
+            'scores': np.asarray(detection_result['scores']).tolist(),
+            'class_ids': np.asarray(detection_result['class_ids']).tolist(),
+            'class_names': np.asarray(detection_result['class_names']).tolist(),
+            'inference_time': detection_result.get('inference_time')
+        }
+    
+    @staticmethod
+    def compute_stats(scores: np.ndarray, class_ids: np.ndarray) -> Dict[str, Any]:
+        """
+        検出結果の統計量をまとめて計算します
+        
+        クラス別の検出数はnp.bincountの1回の走査で求め、表示側で使い回します。
+        
+        Args:
+            scores: 信頼度の配列
+            class_ids: クラスIDの配列
+            
+        Returns:
+            検出数・平均/最大/最小信頼度・クラス別検出数を持つ辞書
+        """
+        num_detections = len(scores)
+        has_detections = num_detections > 0
+        return {
+            'n': num_detections,
+            'mean': float(scores.mean()) if has_detections else 0.0,
+            'max': float(scores.max()) if has_detections else 0.0,
+            'min': float(scores.min()) if has_detections else 0.0,
+            'per_class_counts': np.bincount(class_ids, minlength=len(_COCO_CLASS_ARRAY))
+        }
+    
+    @staticmethod
+    def _get_stats(detection_result: Dict[str, Any]) -> Dict[str, Any]:
+        """検出結果の統計量を取得します（未計算の場合はその場で計算）"""
+        stats = detection_result.get('stats')
+        if stats is None:
+            stats = YOLODetectionProcessor.compute_stats(
+                np.asarray(detection_result['scores']),
+                np.asarray(detection_result['class_ids'], dtype=np.int32)
+            )
+        return stats
+    
+    @staticmethod
+    def _display_debug_summary(detection_result: Dict[str, Any]) -> None:
+        """
+        デバッグ用に検出結果の概要を表示します
+        
+        Args:
+            detection_result: 検出結果
+        """
+        stats = YOLODetectionProcessor._get_stats(detection_result)
+        
+        st.write("**📊 検出結果:**")
+        st.write(f"- 検出された物体数: {stats['n']}")
+        if stats['n'] > 0:
+            st.write(f"- 平均信頼度: {stats['mean']:.3f}")
+            st.write(f"- 最高信頼度: {stats['max']:.3f}")
+        
+        # クラス別の検出数（検出数が0のクラスは表示しない）
+        per_class_counts = stats['per_class_counts']
+        st.write("**🏷️ クラス別検出数:**")
+        for class_id in np.flatnonzero(per_class_counts):
+            st.write(f"  - {_COCO_CLASS_ARRAY[class_id]}: {per_class_counts[class_id]}個")
     
     @staticmethod
     def create_visualization(
@@ -256,48 +819,68 @@ class YOLODetectionProcessor:
             if debug_mode:
                 st.write("**🎨 可視化処理中...**")
             
-            # 画像のコピーを作成
-            vis_image = image.copy()
-            
-            # 検出結果を描画
             boxes = detection_result['boxes']
-            scores = detection_result['scores']
-            class_names = detection_result['class_names']
-            
-            # 色の定義
-            colors = [
-                '#FF0000', '#00FF00', '#0000FF', '#FFFF00', '#FF00FF',
-                '#00FFFF', '#FFA500', '#800080', '#008000', '#800000'
-            ]
             
-            from PIL import ImageDraw, ImageFont
+            # 描画する検出が無い場合は、変換もコピーもせず元画像をそのまま返す
+            if len(boxes) == 0:
+                if debug_mode:
+                    st.write("✅ 可視化完了（検出なし）")
+                return image
             
-            # フォントの設定
-            try:
-                font = ImageFont.truetype("arial.ttf", 16)
-            except:
-                font = ImageFont.load_default()
+            # RGB→BGRの連続したndarrayに変換し、OpenCVで直接描画する
+            vis_array = np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
             
-            draw = ImageDraw.Draw(vis_image)
+            # ラベル文字列は検出結果に保持されたものを使う（古い形式の結果ではここで作成）
+            labels = detection_result.get('labels')
+            if labels is None:
+                labels = [
+                    f"{class_name}: {score:.2f}"
+                    for class_name, score in zip(
+                        detection_result['class_names'], detection_result['scores']
+                    )
+                ]
             
-            for i, (box, score, class_name) in enumerate(zip(boxes, scores, class_names)):
-                x1, y1, x2, y2 = box
-                
-                # 色の選択
-                color = colors[i % len(colors)]
+            # 検出結果を描画
+            for (x1, y1, x2, y2), label_text, class_id in zip(
+                np.asarray(boxes).astype(np.int32).tolist(),
+                labels,
+                detection_result['class_ids']
+            ):
+                # 色の選択（クラスごとに固定）
+                color = _COLORS_BY_CLS[class_id]
                 
                 # バウンディングボックスを描画
-                draw.rectangle([x1, y1, x2, y2], outline=color, width=3)
+                cv2.rectangle(vis_array, (x1, y1), (x2, y2), color, 3)
                 
-                # ラベルテキスト
-                label_text = f"{class_name}: {score:.2f}"
-                
-                # ラベルの背景を描画
-                bbox = draw.textbbox((x1, y1-20), label_text, font=font)
-                draw.rectangle(bbox, fill=color)
+                # ラベルの背景を描画（テキストサイズはラベル文字列ごとにキャッシュ）
+                text_size = _TEXT_SIZE_CACHE.get(label_text)
+                if text_size is None:
+                    text_size = cv2.getTextSize(label_text, _FONT_FACE, _FONT_SCALE, _FONT_THICKNESS)
+                    _TEXT_SIZE_CACHE[label_text] = text_size
+                (text_w, text_h), baseline = text_size
+                label_top = max(y1 - text_h - baseline - 4, 0)
+                cv2.rectangle(
+                    vis_array,
+                    (x1, label_top),
+                    (x1 + text_w + 4, label_top + text_h + baseline + 4),
+                    color,
+                    cv2.FILLED
+                )
                 
                 # ラベルテキストを描画
-                draw.text((x1, y1-20), label_text, fill='white', font=font)
+                cv2.putText(
+                    vis_array,
+                    label_text,
+                    (x1 + 2, label_top + text_h + 2),
+                    _FONT_FACE,
+                    _FONT_SCALE,
+                    (255, 255, 255),
+                    _FONT_THICKNESS,
+                    cv2.LINE_AA
+                )
+            
+            # 最後に一度だけRGBに戻してPIL画像化する
+            vis_image = Image.fromarray(vis_array[:, :, ::-1])
             
             if debug_mode:
                 st.write("✅ 可視化完了")
@@ -376,51 +959,374 @@ class YOLODebugInfo:
         
         st.subheader("📊 検出統計")
         
-        boxes = detection_result['boxes']
         scores = detection_result['scores']
-        class_names = detection_result['class_names']
+        stats = YOLODetectionProcessor._get_stats(detection_result)
+        per_class_counts = stats['per_class_counts']
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("検出物体数", len(boxes))
-            st.metric("平均信頼度", f"{np.mean(scores):.3f}")
+            st.metric("検出物体数", stats['n'])
+            st.metric("平均信頼度", f"{stats['mean']:.3f}")
         
         with col2:
-            st.metric("最高信頼度", f"{np.max(scores):.3f}")
-            st.metric("最低信頼度", f"{np.min(scores):.3f}")
+            st.metric("最高信頼度", f"{stats['max']:.3f}")
+            st.metric("最低信頼度", f"{stats['min']:.3f}")
         
         with col3:
-            st.metric("ユニーククラス数", len(set(class_names)))
+            st.metric("ユニーククラス数", int((per_class_counts > 0).sum()))
             if detection_result.get('inference_time'):
                 st.metric("推論時間", f"{detection_result['inference_time']:.1f}ms")
         
-        # クラス別の検出数
-        unique_classes, counts = np.unique(class_names, return_counts=True)
-        
+        # クラス別の検出数（検出数が0のクラスは表示しない）
         st.write("**🏷️ クラス別検出数:**")
-        for class_name, count in zip(unique_classes, counts):
-            st.write(f"  - {class_name}: {count}個")
+        for class_id in np.flatnonzero(per_class_counts):
+            st.write(f"  - {_COCO_CLASS_ARRAY[class_id]}: {per_class_counts[class_id]}個")
         
-        # 信頼度分布
+        # 信頼度分布（ヒストグラムはNumPyで集計し、描画はブラウザ側のチャートに任せる）
         if len(scores) > 0:
             st.write("**📈 信頼度分布:**")
-            import matplotlib.pyplot as plt
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.hist(scores, bins=20, alpha=0.7, color='skyblue', edgecolor='black')
-            ax.set_xlabel('信頼度')
-            ax.set_ylabel('頻度')
-            ax.set_title('検出信頼度の分布')
-            st.pyplot(fig)
+            counts, edges = np.histogram(scores, bins=20, range=(0.0, 1.0))
+            centers = 0.5 * (edges[:-1] + edges[1:])
+            st.bar_chart({"信頼度": centers, "頻度": counts}, x="信頼度", y="頻度")
+
+
+class YOLOPreprocessor:
+    """YOLOv8入力の前処理と、結果の元画像座標への復元を担当するクラス"""
+    
+    PAD_COLOR = (114, 114, 114)
+    
+    @staticmethod
+    def to_rgb_array(image) -> np.ndarray:
+        """
+        入力画像をRGBのndarrayに変換します
+        
+        Args:
+            image: PIL画像、またはRGBのndarray
+            
+        Returns:
+            RGBのndarray (H, W, 3)
+        """
+        if isinstance(image, Image.Image):
+            return np.asarray(image.convert("RGB"))
+        return np.asarray(image)
+    
+    @staticmethod
+    def letterbox(
+        image: np.ndarray,
+        new_shape: Tuple[int, int] = (640, 640)
+    ) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+        """
+        アスペクト比を保ったままリサイズし、余白をパディングして固定サイズにします
+        
+        Args:
+            image: 入力画像 (H, W, 3)
+            new_shape: 出力サイズ (高さ, 幅)
+            
+        Returns:
+            (レターボックス画像, 縮小率, (左右パディング, 上下パディング))のタプル
+        """
+        height, width = image.shape[:2]
+        ratio = min(new_shape[0] / height, new_shape[1] / width)
+        resized_w, resized_h = int(round(width * ratio)), int(round(height * ratio))
+        
+        if (resized_w, resized_h) != (width, height):
+            image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+        
+        pad_w = (new_shape[1] - resized_w) / 2
+        pad_h = (new_shape[0] - resized_h) / 2
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        
+        image = cv2.copyMakeBorder(
+            image, top, bottom, left, right,
+            cv2.BORDER_CONSTANT, value=YOLOPreprocessor.PAD_COLOR
+        )
+        return image, ratio, (pad_w, pad_h)
+    
+    @staticmethod
+    def to_tensor(image: np.ndarray, half: bool = False) -> torch.Tensor:
+        """
+        レターボックス済みRGB画像を正規化済みのBCHWテンソルに変換します
+        
+        Args:
+            image: レターボックス済みRGB画像 (H, W, 3)
+            half: FP16テンソルを作成するかどうか
+            
+        Returns:
+            値域0〜1の入力テンソル (1, 3, H, W)
+        """
+        # 正規化とHWC→CHWの並べ替えをblobFromImageの1パスで行う（既にRGBのためチャンネル入れ替えはしない）
+        blob = cv2.dnn.blobFromImage(image, scalefactor=1.0 / 255.0, swapRB=False, crop=False)
+        if half:
+            blob = blob.astype(np.float16)
+        return torch.from_numpy(blob)
+    
+    @staticmethod
+    def to_tensor_into(image: np.ndarray, out: np.ndarray) -> None:
+        """
+        レターボックス済みRGB画像を正規化し、既存のCHWバッファに直接書き込みます
+        
+        Args:
+            image: レターボックス済みRGB画像 (H, W, 3)
+            out: 書き込み先のバッファ (3, H, W)
+        """
+        np.multiply(image.transpose(2, 0, 1), 1.0 / 255.0, out=out, casting="unsafe")
+    
+    @staticmethod
+    def restore_result(
+        result,
+        original_rgb: np.ndarray,
+        input_shape: Tuple[int, int],
+        ratio: float,
+        pad: Tuple[float, float]
+    ):
+        """
+        レターボックス座標の検出結果を元画像の座標系に戻します
+        
+        Args:
+            result: Ultralyticsの検出結果
+            original_rgb: 元画像 (RGB)
+            input_shape: モデル入力サイズ (高さ, 幅)
+            ratio: 縮小率
+            pad: (左右パディング, 上下パディング)
+            
+        Returns:
+            元画像を持ち、座標が元画像基準に変換された検出結果
+        """
+        # Ultralyticsの結果オブジェクトは元画像をBGRで保持する
+        result.orig_img = np.ascontiguousarray(original_rgb[..., ::-1])
+        result.orig_shape = original_rgb.shape[:2]
+        
+        if result.boxes is not None:
+            boxes = result.boxes.data.clone()
+            if len(boxes) > 0:
+                boxes[:, :4] = ops.scale_boxes(
+                    input_shape, boxes[:, :4], result.orig_shape,
+                    ratio_pad=((ratio, ratio), pad)
+                )
+            result.update(boxes=boxes)
+        
+        return result
+
+
+class YOLOBatchInferenceWorker:
+    """
+    複数フレームを動的にバッチングして推論するバックグラウンドワーカー
+    
+    前処理はスレッドプールで並列に行い、推論は単一のワーカースレッドが
+    待ち時間内に揃ったフレームを最大MAX_BATCH_SIZE枚までまとめて実行します。
+    """
+    
+    MAX_BATCH_SIZE = YOLOModelLoader.MAX_BATCH_SIZE
+    BATCH_WAIT_SECONDS = 0.005
+    PREPROCESS_WORKERS = 4
+    # 推論スレッドに停止を知らせるためにキューへ入れる番兵
+    _STOP = None
+    
+    def __init__(self, manager: "YOLOModelManager"):
+        """
+        ワーカーを初期化し、推論スレッドを開始します
+        
+        Args:
+            manager: 推論に使用するモデルマネージャー
+        """
+        self._manager = manager
+        self._queue = queue.Queue()
+        self._preprocess_pool = ThreadPoolExecutor(
+            max_workers=self.PREPROCESS_WORKERS,
+            thread_name_prefix="yolo-preprocess"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="yolo-batch-inference", daemon=True
+        )
+        self._thread.start()
+    
+    def submit(self, frame, confidence: float, nms_threshold: float) -> Future:
+        """
+        フレームを前処理キューに投入します
+        
+        Args:
+            frame: 入力画像（PIL画像、またはRGBのndarray）
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            
+        Returns:
+            検出結果を受け取るFuture
+        """
+        future = Future()
+        self._preprocess_pool.submit(self._enqueue, frame, confidence, nms_threshold, future)
+        return future
+    
+    def close(self) -> None:
+        """
+        ワーカーを停止します
+        
+        投入済みのフレームは前処理と推論を済ませてから停止するため、
+        返したFutureはすべて完了します。停止後は推論スレッドがマネージャーと
+        モデルへの参照を手放すため、モデルをメモリから解放できます。
+        """
+        # 前処理中のフレームがキューに入りきってから番兵を入れる
+        self._preprocess_pool.shutdown(wait=True)
+        self._queue.put(self._STOP)
+    
+    def _enqueue(self, frame, confidence: float, nms_threshold: float, future: Future) -> None:
+        """フレームを前処理し、推論キューに追加します"""
+        if not future.set_running_or_notify_cancel():
+            return
+        
+        try:
+            prepared = self._manager._preprocess(frame)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        
+        self._queue.put((prepared, confidence, nms_threshold, future))
+    
+    def _run(self) -> None:
+        """キューからフレームを集めてバッチ推論を繰り返します"""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.BATCH_WAIT_SECONDS
+            
+            while len(batch) < self.MAX_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            # 閾値が異なるフレームは別々のバッチとして推論する
+            groups: Dict[Tuple[float, float], List[Any]] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            
+            for (confidence, nms_threshold), items in groups.items():
+                self._run_batch(items, confidence, nms_threshold)
+            
+            if stopping:
+                return
+    
+    def _run_batch(self, items: List[Any], confidence: float, nms_threshold: float) -> None:
+        """1バッチ分の推論を実行し、各Futureに結果を設定します"""
+        futures = [future for _, _, _, future in items]
+        
+        try:
+            results = self._manager._predict_batch(
+                [prepared for prepared, _, _, _ in items],
+                confidence,
+                nms_threshold
+            )
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+
+class _GraphRunner:
+    """
+    固定サイズ入力の順伝播をCUDAグラフとしてキャプチャし、再生するクラス
+    
+    入力は常に640x640にレターボックスされるため、順伝播の全カーネルを
+    一度キャプチャしておけば、フレームごとのカーネル起動オーバーヘッドを省けます。
+    """
+    
+    WARMUP_ITERATIONS = 3
+    
+    def __init__(self, module: torch.nn.Module, input_shape: Tuple[int, ...]):
+        """
+        ウォームアップ後に順伝播をCUDAグラフにキャプチャします
+        
+        Args:
+            module: CUDA上のPyTorchモデル
+            input_shape: 入力テンソルの形状 (1, 3, H, W)
+        """
+        parameter = next(module.parameters())
+        self.static_input = torch.zeros(
+            input_shape, device=parameter.device, dtype=parameter.dtype
+        ).contiguous(memory_format=torch.channels_last)
+        
+        with torch.inference_mode():
+            # キャプチャ前のウォームアップは別ストリームで行う必要がある
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream):
+                for _ in range(self.WARMUP_ITERATIONS):
+                    module(self.static_input)
+            torch.cuda.current_stream().wait_stream(stream)
+            
+            self.graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self.graph):
+                self.static_output = module(self.static_input)
+    
+    def run(self, input_tensor: torch.Tensor):
+        """
+        入力を固定バッファにコピーし、キャプチャ済みのグラフを再生します
+        
+        戻り値はグラフの固定出力バッファのため、次の再生までに後処理を済ませる必要があります。
+        
+        Args:
+            input_tensor: 入力テンソル (1, 3, H, W)
+            
+        Returns:
+            モデルの生の出力
+        """
+        self.static_input.copy_(input_tensor, non_blocking=True)
+        self.graph.replay()
+        return self.static_output
+
+
+class StaticFrameState:
+    """
+    静止フレームのスキップに使う、直前のフレームの状態
+    
+    モデルマネージャーはプロセス全体で共有されるため、この状態は呼び出し元
+    （セッションやカメラ・ストリーム）ごとに作成してdetect_objectsに渡します。
+    """
+    
+    def __init__(self):
+        """状態の初期化"""
+        # 直前のフレームの(サムネイル, 検出条件, 検出結果)
+        self.prev_frame = None
 
 
 class YOLOModelManager:
     """YOLOv8モデルの管理を担当するクラス"""
     
+    # 静止フレーム判定用のサムネイルサイズと、平均画素差の閾値
+    STATIC_FRAME_THUMB_SIZE = (64, 64)
+    STATIC_FRAME_DIFF_THRESHOLD = 2.0
+    
     def __init__(self):
         """モデルマネージャーの初期化"""
         self.model = None
         self.model_name = "yolov8n.pt"
+        self._half = False
+        self._channels_last = False
+        # Ultralyticsの推論器はスレッドセーフではないため、推論呼び出しを直列化する
+        self._inference_lock = threading.Lock()
+        # バッチ推論ワーカーは初回の非同期推論時に1つだけ生成する
+        self._batch_worker_lock = threading.Lock()
+        self._batch_worker = None
+        self._graph_runner = None
+        self._compiled_module = None
+        # 1枚推論用の入力バッファ（ピン留めメモリとGPUメモリ、初回推論時に確保）
+        self._pinned_input = None
+        self._device_input = None
+        self._input_copied = None
     
     def load_model(self, model_name: str = "yolov8n.pt") -> bool:
         """
@@ -433,48 +1339,386 @@ class YOLOModelManager:
             読み込み成功時はTrue
         """
         try:
+            if self.model is not None and model_name != self.model_name:
+                # 新しいモデルを読み込む前に、前のモデルへの参照とGPUメモリを解放する
+                self.model = None
+                self._release_gpu_buffers()
+            
             self.model = YOLOModelLoader.load_model(model_name)
             self.model_name = model_name
+            self._half = YOLOModelLoader.use_half_precision()
+            self._channels_last = YOLOModelLoader.uses_channels_last(self.model)
+            # torch.compile（CUDAグラフを内部で使用）できた場合は、自前のCUDAグラフは作成しない
+            self._compiled_module = YOLOModelLoader.compile_model(self.model)
+            if self._compiled_module is None:
+                self._graph_runner = self._build_graph_runner()
             return self.model is not None
         except Exception as e:
             st.error(f"モデルの読み込みに失敗しました: {e}")
             return False
     
+    def close(self) -> None:
+        """
+        バッチ推論ワーカーを停止します
+        
+        ワーカーの推論スレッドはマネージャーとモデルへの参照を持ち続けるため、
+        マネージャーをキャッシュから破棄する際に呼び出します。
+        次にdetect_objects_asyncを呼び出すと、ワーカーは再び生成されます。
+        """
+        with self._batch_worker_lock:
+            worker, self._batch_worker = self._batch_worker, None
+        if worker is not None:
+            worker.close()
+    
+    def _release_gpu_buffers(self) -> None:
+        """モデル切り替え時に、前のモデル用のGPUバッファを解放します"""
+        self._graph_runner = None
+        self._compiled_module = None
+        self._pinned_input = None
+        self._device_input = None
+        self._input_copied = None
+        gc.collect()
+        if torch.cuda.is_available():
+            # PyTorchのキャッシュアロケーターが保持し続ける未使用ブロックを返却する
+            torch.cuda.empty_cache()
+            torch.cuda.ipc_collect()
+    
+    def _build_graph_runner(self) -> Optional[_GraphRunner]:
+        """
+        GPU上のPyTorchモデルの場合、1枚推論用のCUDAグラフを作成します
+        
+        TensorRT・OpenVINOなどのエクスポート済みモデルやCPU推論では使用しません。
+        
+        Returns:
+            CUDAグラフのランナー、対象外またはキャプチャに失敗した場合はNone
+        """
+        module = getattr(self.model, "model", None)
+        if not torch.cuda.is_available() or not isinstance(module, torch.nn.Module):
+            return None
+        if next(module.parameters()).device.type != "cuda":
+            return None
+        
+        input_size = YOLOModelLoader.INPUT_SIZE
+        try:
+            return _GraphRunner(module.eval(), (1, 3, input_size, input_size))
+        except RuntimeError as e:
+            logger.warning("CUDA graph capture failed, falling back to eager inference: %s", e)
+            return None
+    
     def detect_objects(
         self, 
         image, 
         confidence: float = 0.5, 
-        nms_threshold: float = 0.4
+        nms_threshold: float = 0.4,
+        stream: bool = False,
+        static_frame_state: Optional[StaticFrameState] = None
     ):
         """
         物体検出を実行します
         
         Args:
-            image: 入力画像
+            image: 入力画像（PIL画像、またはRGBのndarray）。
+                stream=Trueの場合は入力画像のイテラブル
             confidence: 信頼度閾値
             nms_threshold: NMS閾値
+            stream: Trueの場合、画像を1枚ずつ推論するジェネレーターを返す
+            static_frame_state: 指定した場合、この状態に記録された直前のフレームと
+                ほぼ同じフレームでは推論を省略し、直前の検出結果を返す（動画向け）。
+                呼び出し元（セッションやストリーム）ごとに別のStaticFrameStateを渡す
             
         Returns:
-            検出結果
+            検出結果（stream=Trueの場合は検出結果のジェネレーター）
         """
         if self.model is None:
             st.error("モデルが読み込まれていません")
             return None
         
+        if stream:
+            return self._iter_detect(image, confidence, nms_threshold, static_frame_state)
+        
         try:
-            # 検出実行
-            results = self.model(
-                image,
+            return self._predict_with_state(image, confidence, nms_threshold, static_frame_state)
+        except _INFERENCE_ERRORS as e:
+            _report_inference_error(e, "検出中にエラーが発生しました")
+            return None
+    
+    def _iter_detect(
+        self,
+        images,
+        confidence: float,
+        nms_threshold: float,
+        static_frame_state: Optional[StaticFrameState] = None
+    ):
+        """
+        複数画像を1枚ずつ推論し、検出結果を順に返します
+        
+        結果をリストに溜めないため、画像枚数によらずGPUメモリ使用量は1枚分に抑えられます。
+        
+        Args:
+            images: 入力画像のイテラブル
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            static_frame_state: 指定した場合、静止フレームでは直前の検出結果を再利用する
+            
+        Yields:
+            各画像の検出結果
+        """
+        for image in images:
+            try:
+                result = self._predict_with_state(
+                    image, confidence, nms_threshold, static_frame_state
+                )
+            except _INFERENCE_ERRORS as e:
+                _report_inference_error(e, "検出中にエラーが発生しました")
+                continue
+            yield result
+    
+    def detect_objects_async(
+        self,
+        frame,
+        confidence: float = 0.5,
+        nms_threshold: float = 0.4
+    ) -> Future:
+        """
+        フレームをバックグラウンドの動的バッチ推論に投入します
+        
+        複数のカメラ・ストリームから同時に届いたフレームは、
+        ワーカースレッドで最大バッチサイズまでまとめて1回の推論で処理されます。
+        
+        Args:
+            frame: 入力画像（PIL画像、またはRGBのndarray）
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            
+        Returns:
+            検出結果を受け取るFuture
+        """
+        if self.model is None:
+            raise RuntimeError("モデルが読み込まれていません")
+        
+        with self._batch_worker_lock:
+            if self._batch_worker is None:
+                self._batch_worker = YOLOBatchInferenceWorker(self)
+            worker = self._batch_worker
+        return worker.submit(frame, confidence, nms_threshold)
+    
+    def _predict_with_state(
+        self,
+        image,
+        confidence: float,
+        nms_threshold: float,
+        static_frame_state: Optional[StaticFrameState]
+    ):
+        """
+        静止フレームの状態が指定されていれば、静止フレームの推論を省略して推論します
+        
+        Args:
+            image: 入力画像（PIL画像、またはRGBのndarray）
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            static_frame_state: 呼び出し元ごとの静止フレームの状態、またはNone
+            
+        Returns:
+            検出結果
+        """
+        if static_frame_state is None:
+            return self._predict(image, confidence, nms_threshold)
+        return self._predict_unless_static(image, confidence, nms_threshold, static_frame_state)
+    
+    def _predict_unless_static(
+        self,
+        image,
+        confidence: float,
+        nms_threshold: float,
+        static_frame_state: StaticFrameState
+    ):
+        """
+        直前のフレームからほとんど変化していなければ推論を省略します
+        
+        64x64のグレースケール縮小画像同士の平均絶対差で変化を判定し、
+        閾値未満かつ検出条件（モデルと閾値）が同じ場合は直前の検出結果をそのまま返します。
+        
+        Args:
+            image: 入力画像（PIL画像、またはRGBのndarray）
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            static_frame_state: 呼び出し元ごとの静止フレームの状態
+            
+        Returns:
+            検出結果
+        """
+        thumbnail = cv2.cvtColor(
+            cv2.resize(
+                YOLOPreprocessor.to_rgb_array(image),
+                self.STATIC_FRAME_THUMB_SIZE,
+                interpolation=cv2.INTER_AREA
+            ),
+            cv2.COLOR_RGB2GRAY
+        )
+        # モデル切り替え後は、前のモデルの検出結果を再利用しない
+        conditions = (self.model_name, confidence, nms_threshold)
+        
+        prev_frame = static_frame_state.prev_frame
+        if prev_frame is not None:
+            prev_thumbnail, prev_conditions, prev_result = prev_frame
+            diff = np.abs(thumbnail.astype(np.int16) - prev_thumbnail).mean()
+            if prev_conditions == conditions and diff < self.STATIC_FRAME_DIFF_THRESHOLD:
+                return prev_result
+        
+        result = self._predict(image, confidence, nms_threshold)
+        static_frame_state.prev_frame = (thumbnail, conditions, result)
+        return result
+    
+    def _predict(self, image, confidence: float, nms_threshold: float):
+        """
+        1枚の画像を前処理して推論し、元画像座標の検出結果を返します
+        
+        Args:
+            image: 入力画像（PIL画像、またはRGBのndarray）
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            
+        Returns:
+            検出結果、結果が空の場合はNone
+        """
+        input_size = YOLOModelLoader.INPUT_SIZE
+        original = YOLOPreprocessor.to_rgb_array(image)
+        letterboxed, ratio, pad = YOLOPreprocessor.letterbox(
+            original, (input_size, input_size)
+        )
+        
+        with self._inference_lock, torch.inference_mode():
+            # 入力バッファは共有のため、転送から推論まではロック内で行う
+            input_tensor = self._stage_input(letterboxed)
+            
+            predictions = None
+            if self._graph_runner is not None:
+                # CUDAグラフを再生し、固定出力バッファが上書きされる前にNMSまで済ませる
+                predictions = self._graph_runner.run(input_tensor)
+            elif self._compiled_module is not None:
+                # コンパイル済みの順伝播を直接実行する（重みのdtypeに入力をそろえる）
+                parameter = next(self._compiled_module.parameters())
+                predictions = self._compiled_module(
+                    input_tensor.to(device=parameter.device, dtype=parameter.dtype)
+                )
+            
+            if predictions is not None:
+                detections = non_max_suppression(
+                    predictions, conf_thres=confidence, iou_thres=nms_threshold
+                )[0]
+                result = Results(original, path="", names=self.model.names, boxes=detections)
+            else:
+                # 検出実行（autogradの記録を完全に無効化し、結果はジェネレーターで受け取る）
+                result = next(self.model.predict(
+                    input_tensor,
+                    conf=confidence,
+                    iou=nms_threshold,
+                    half=self._half,
+                    stream=True,
+                    verbose=False
+                ), None)
+        if result is None:
+            return None
+        
+        return YOLOPreprocessor.restore_result(
+            result, original, input_tensor.shape[2:], ratio, pad
+        )
+    
+    def _stage_input(self, letterboxed: np.ndarray) -> torch.Tensor:
+        """
+        レターボックス済み画像を推論用の入力テンソルにします
+        
+        GPU推論では、事前確保したピン留めメモリに正規化しながら直接書き込み、
+        非同期DMAで事前確保済みのGPUテンソルへ転送します（フレームごとの確保を避ける）。
+        _inference_lockを保持した状態で呼び出す必要があります。
+        
+        Args:
+            letterboxed: レターボックス済みRGB画像 (H, W, 3)
+            
+        Returns:
+            入力テンソル (1, 3, H, W)
+        """
+        if not torch.cuda.is_available():
+            return YOLOPreprocessor.to_tensor(letterboxed, half=self._half)
+        
+        shape = (1, letterboxed.shape[2], *letterboxed.shape[:2])
+        dtype = torch.float16 if self._half else torch.float32
+        if (
+            self._pinned_input is None
+            or tuple(self._pinned_input.shape) != shape
+            or self._pinned_input.dtype != dtype
+        ):
+            self._pinned_input = torch.empty(shape, dtype=dtype, pin_memory=True)
+            # channels_lastのモデルにはNHWCの入力を渡す（レイアウト変換はGPU上のコピーで行う）
+            memory_format = torch.channels_last if self._channels_last else torch.contiguous_format
+            self._device_input = torch.empty_like(
+                self._pinned_input, device="cuda", memory_format=memory_format
+            )
+            self._input_copied = torch.cuda.Event()
+        else:
+            # 前回の非同期転送が完了するまでピン留めバッファを上書きしない
+            self._input_copied.synchronize()
+        
+        YOLOPreprocessor.to_tensor_into(letterboxed, self._pinned_input.numpy()[0])
+        self._device_input.copy_(self._pinned_input, non_blocking=True)
+        self._input_copied.record()
+        return self._device_input
+    
+    def _predict_batch(
+        self,
+        prepared: List[Tuple[np.ndarray, torch.Tensor, float, Tuple[float, float]]],
+        confidence: float,
+        nms_threshold: float
+    ) -> List[Any]:
+        """
+        前処理済みの複数画像を1回の推論で処理します
+        
+        Args:
+            prepared: _preprocessの戻り値のリスト
+            confidence: 信頼度閾値
+            nms_threshold: NMS閾値
+            
+        Returns:
+            各画像の検出結果のリスト
+        """
+        batch = torch.cat([input_tensor for _, input_tensor, _, _ in prepared], dim=0)
+        if self._channels_last:
+            batch = batch.contiguous(memory_format=torch.channels_last)
+        
+        with self._inference_lock, torch.inference_mode():
+            results = self.model.predict(
+                batch,
                 conf=confidence,
                 iou=nms_threshold,
+                half=self._half,
                 verbose=False
             )
-            return results[0] if results else None
-        except Exception as e:
-            st.error(f"検出中にエラーが発生しました: {e}")
-            return None
+        
+        return [
+            YOLOPreprocessor.restore_result(result, original, batch.shape[2:], ratio, pad)
+            for result, (original, _, ratio, pad) in zip(results, prepared)
+        ]
+    
+    def _preprocess(self, image) -> Tuple[np.ndarray, torch.Tensor, float, Tuple[float, float]]:
+        """
+        入力画像をレターボックス済みの入力テンソルに変換します
+        
+        Args:
+            image: 入力画像（PIL画像、またはRGBのndarray）
+            
+        Returns:
+            (元画像, 入力テンソル, 縮小率, パディング)のタプル
+        """
+        # 前処理（レターボックス＋正規化）はOpenCVで一度だけ行う
+        input_size = YOLOModelLoader.INPUT_SIZE
+        original = YOLOPreprocessor.to_rgb_array(image)
+        letterboxed, ratio, pad = YOLOPreprocessor.letterbox(
+            original, (input_size, input_size)
+        )
+        input_tensor = YOLOPreprocessor.to_tensor(letterboxed, half=self._half)
+        return original, input_tensor, ratio, pad
     
-    def get_available_models(self) -> List[str]:
+    def get_available_models(self) -> Tuple[str, ...]:
         """利用可能なモデルのリストを取得"""
         return YOLOModelLoader.get_available_models()
     
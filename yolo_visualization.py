@@ -3,315 +3,312 @@ YOLOv8の処理フロー可視化モジュール
 画像→バックボーン→Neck→Head→検出の流れを視覚的に表現
 """
 
+import io
 import streamlit as st
+import matplotlib
+# 図は画像として配信するだけなので、GUIバックエンドを読み込まないようAggを明示する
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection, PatchCollection
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-import torch
-from typing import List, Tuple, Optional, Dict, Any
-import seaborn as sns
+from dataclasses import dataclass
+from typing import Tuple, Optional, Dict, Any
+
+plt.ioff()
+
+
+# 図に使用する日本語フォントの候補（優先順）
+_JAPANESE_FONT_CANDIDATES = (
+    'Noto Sans CJK JP',
+    'Noto Sans JP',
+    'Hiragino Sans',
+    'Yu Gothic',
+    'Meiryo',
+    'Takao',
+    'IPAexGothic',
+    'IPAPGothic',
+    'VL PGothic'
+)
+
+
+def _resolve_diagram_font() -> Optional[str]:
+    """
+    候補のうち実際にインストールされている最初の日本語フォントを探します
+    
+    フォールバックの連鎖を毎回たどらないよう、インポート時に一度だけ解決して
+    見つかった1つだけをfont.familyに設定します。
+    
+    Returns:
+        見つかったフォント名、どれも無い場合はNone
+    """
+    import matplotlib.font_manager as fm
+    
+    for font in _JAPANESE_FONT_CANDIDATES:
+        try:
+            fm.findfont(fm.FontProperties(family=font), fallback_to_default=False)
+        except ValueError:
+            continue
+        return font
+    return None
+
+
+# インポート時に解決したフォント名（見つからない場合はNone）
+_DIAGRAM_FONT = _resolve_diagram_font()
+
+if _DIAGRAM_FONT:
+    plt.rcParams['font.family'] = [_DIAGRAM_FONT]
+else:
+    # フォールバック: デフォルトフォントを使用し、警告を抑制
+    plt.rcParams['font.family'] = ['DejaVu Sans']
+    import warnings
+    warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    """処理フロー図の1ステップの描画情報"""
+    
+    __slots__ = ('x', 'y', 'edge', 'face', 'icon', 'label', 'sub')
+    
+    x: float
+    y: float
+    edge: str
+    face: str
+    icon: str  # 枠内に表示する文字（絵文字はフォント探索が遅く、多くの環境で表示できないため使わない）
+    label: str
+    sub: str
+
+
+@dataclass(frozen=True)
+class RectSpec:
+    """図中の矩形1つの描画情報（(x, y)は左下の座標）"""
+    
+    __slots__ = ('x', 'y', 'width', 'height', 'linewidth', 'edge', 'face')
+    
+    x: float
+    y: float
+    width: float
+    height: float
+    linewidth: float
+    edge: str
+    face: str
+
+
+@dataclass(frozen=True)
+class TextSpec:
+    """図中のテキスト1つの描画情報"""
+    
+    __slots__ = ('x', 'y', 'text', 'style')
+    
+    x: float
+    y: float
+    text: str
+    style: Dict[str, Any]  # ax.textに渡すキーワード引数
+
+
+@dataclass(frozen=True)
+class DiagramSpec:
+    """矩形・テキスト・矢印で構成される図全体の描画情報"""
+    
+    __slots__ = ('figsize', 'xlim', 'ylim', 'rects', 'texts', 'arrows', 'arrow_width')
+    
+    figsize: Tuple[float, float]
+    xlim: Tuple[float, float]
+    ylim: Tuple[float, float]
+    rects: Tuple[RectSpec, ...]
+    texts: Tuple[TextSpec, ...]
+    arrows: np.ndarray  # 矢印の始点・終点 (N, 2, 2)
+    arrow_width: float
 
 
 class YOLOv8Visualizer:
     """YOLOv8の処理フローを可視化するクラス"""
     
-    def __init__(self):
-        """可視化クラスの初期化"""
-        # 日本語フォントの設定
-        import matplotlib.font_manager as fm
-        
-        # 利用可能な日本語フォントを検索
-        japanese_fonts = [
-            'Noto Sans CJK JP',
-            'Noto Sans JP', 
-            'Hiragino Sans',
-            'Yu Gothic',
-            'Meiryo',
-            'Takao',
-            'IPAexGothic',
-            'IPAPGothic',
-            'VL PGothic',
-            'DejaVu Sans'
-        ]
-        
-        # 利用可能なフォントを確認
-        available_fonts = [f.name for f in fm.fontManager.ttflist]
-        selected_font = None
-        
-        for font in japanese_fonts:
-            if font in available_fonts:
-                selected_font = font
-                break
-        
-        if selected_font:
-            plt.rcParams['font.family'] = selected_font
-        else:
-            # フォールバック: デフォルトフォントを使用し、警告を抑制
-            plt.rcParams['font.family'] = 'DejaVu Sans'
-            import warnings
-            warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
+    # 比較図で共有するモデルごとのデータ（呼び出しごとにリストを作らない）
+    # 列ごとに連続した配列として持ち、各比較図は必要な列だけを参照する
+    DATA = np.rec.fromarrays(
+        [
+            ['YOLOv8n', 'YOLOv8s', 'YOLOv8m', 'YOLOv8l', 'YOLOv8x'],
+            [3.2, 11.2, 25.9, 43.7, 68.2],  # 百万パラメータ
+            [0.637, 0.718, 0.764, 0.792, 0.814],
+            [115, 85, 52, 39, 28]
+        ],
+        names='model,params_m,map50,fps_gpu'
+    )
+    MODEL_COLORS = ('#007bff', '#28a745', '#ffc107', '#fd7e14', '#dc3545')
+    
+    # 処理フロー図の各ステップ
+    PROCESS_STEPS = (
+        StepSpec(1.5, 6, '#007bff', '#e3f2fd', '1', '画像入力', '640x640'),
+        StepSpec(3.5, 6, '#28a745', '#e8f5e8', '2', 'バックボーン', 'CSPDarknet'),
+        StepSpec(5.5, 6, '#ffc107', '#fff8e1', '3', 'Neck (FPN)', 'PANet'),
+        StepSpec(7.5, 6, '#fd7e14', '#fff3e0', '4', 'Head', 'Anchor-Free'),
+        StepSpec(9.5, 6, '#dc3545', '#fce4ec', '5', '検出結果', 'バウンディングボックス')
+    )
+    
+    # ステップ間の矢印の始点・終点と、そのラベル
+    ARROW_SEGMENTS = np.array([
+        [[2.3, 6], [2.7, 6]],  # 画像→バックボーン
+        [[4.3, 6], [4.7, 6]],  # バックボーン→Neck
+        [[6.3, 6], [6.7, 6]],  # Neck→Head
+        [[8.3, 6], [8.7, 6]]   # Head→検出
+    ])
+    ARROW_LABELS = ('特徴抽出', 'マルチスケール', '予測', '後処理')
     
     @staticmethod
-    def create_processing_flow_diagram() -> plt.Figure:
+    def render_diagram(spec: DiagramSpec) -> plt.Figure:
         """
-        YOLOv8の処理フロー図を作成します
+        図形とテキストで構成される図をDiagramSpecから描画します
+        
+        矩形は1つのPatchCollection、矢印の軸線は1つのLineCollectionとしてまとめて追加し、
+        矢じりは向きごとに1回のscatterで描画します。
         
+        Args:
+            spec: 図の描画情報
+            
         Returns:
-            処理フロー図のmatplotlib Figure
+            描画したmatplotlib Figure
         """
-        fig, ax = plt.subplots(1, 1, figsize=(14, 8))
-        ax.set_xlim(0, 12)
-        ax.set_ylim(0, 8)
+        fig, ax = plt.subplots(1, 1, figsize=spec.figsize)
+        ax.set_xlim(*spec.xlim)
+        ax.set_ylim(*spec.ylim)
         ax.axis('off')
         
         # 背景色
         ax.set_facecolor('#f8f9fa')
         
-        # ステップ1: 画像入力
-        YOLOv8Visualizer._draw_image_input_step(ax, 1.5, 6)
+        ax.add_collection(PatchCollection(
+            [patches.Rectangle((rect.x, rect.y), rect.width, rect.height) for rect in spec.rects],
+            linewidths=[rect.linewidth for rect in spec.rects],
+            edgecolors=[rect.edge for rect in spec.rects],
+            facecolors=[rect.face for rect in spec.rects]
+        ))
         
-        # ステップ2: バックボーン
-        YOLOv8Visualizer._draw_backbone_step(ax, 3.5, 6)
+        arrows = spec.arrows
+        if len(arrows):
+            ax.add_collection(LineCollection(arrows, colors='#333', linewidths=spec.arrow_width))
+            
+            # 矢じりの向きを始点→終点の主方向から決める
+            dx, dy = (arrows[:, 1] - arrows[:, 0]).T
+            markers = np.where(
+                np.abs(dx) >= np.abs(dy),
+                np.where(dx >= 0, '>', '<'),
+                np.where(dy >= 0, '^', 'v')
+            )
+            for marker in np.unique(markers):
+                heads = arrows[markers == marker, 1]
+                ax.scatter(heads[:, 0], heads[:, 1], marker=marker, s=40*spec.arrow_width,
+                          c='#333', zorder=3)
+        
+        for text in spec.texts:
+            ax.text(text.x, text.y, text.text, **text.style)
         
-        # ステップ3: Neck (FPN)
-        YOLOv8Visualizer._draw_neck_step(ax, 5.5, 6)
+        return fig
+    
+    @staticmethod
+    def processing_flow_spec() -> DiagramSpec:
+        """
+        YOLOv8の処理フロー図の描画情報を作成します
         
-        # ステップ4: Head
-        YOLOv8Visualizer._draw_head_step(ax, 7.5, 6)
+        Returns:
+            処理フロー図のDiagramSpec
+        """
+        steps = YOLOv8Visualizer.PROCESS_STEPS
+        segments = YOLOv8Visualizer.ARROW_SEGMENTS
         
-        # ステップ5: 検出結果
-        YOLOv8Visualizer._draw_detection_step(ax, 9.5, 6)
+        # 5つのステップ（画像入力→バックボーン→Neck→Head→検出結果）
+        rects = tuple(
+            RectSpec(step.x-0.8, step.y-0.6, 1.6, 1.2, 2, step.edge, step.face)
+            for step in steps
+        )
         
-        # 矢印で接続
-        YOLOv8Visualizer._draw_arrows(ax)
+        texts = []
+        for step in steps:
+            texts.append(TextSpec(step.x, step.y+0.1, step.icon,
+                                  dict(fontsize=24, fontweight='bold', ha='center', color=step.edge)))
+            texts.append(TextSpec(step.x, step.y-0.8, step.label,
+                                  dict(fontsize=12, fontweight='bold', ha='center')))
+            texts.append(TextSpec(step.x, step.y-1.0, step.sub,
+                                  dict(fontsize=10, ha='center', color='#666')))
+        
+        # 矢印のラベル
+        arrow_label_style = dict(fontsize=9, ha='center',
+                                 bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
+        for (mid_x, mid_y), label in zip(segments.mean(axis=1), YOLOv8Visualizer.ARROW_LABELS):
+            texts.append(TextSpec(mid_x, mid_y+0.3, label, arrow_label_style))
         
         # タイトル
-        ax.text(6, 7.5, '🚀 YOLOv8 処理フロー', 
-                fontsize=20, fontweight='bold', ha='center',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
+        texts.append(TextSpec(6, 7.5, 'YOLOv8 処理フロー',
+                              dict(fontsize=20, fontweight='bold', ha='center',
+                                   bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))))
         
-        return fig
+        return DiagramSpec((14, 8), (0, 12), (0, 8), rects, tuple(texts), segments, 2)
     
     @staticmethod
-    def _draw_image_input_step(ax, x: float, y: float):
-        """画像入力ステップを描画"""
-        # 画像の枠
-        rect = patches.Rectangle((x-0.8, y-0.6), 1.6, 1.2, 
-                               linewidth=2, edgecolor='#007bff', facecolor='#e3f2fd')
-        ax.add_patch(rect)
-        
-        # 画像アイコン
-        ax.text(x, y+0.1, '📷', fontsize=24, ha='center')
-        
-        # ラベル
-        ax.text(x, y-0.8, '画像入力', fontsize=12, fontweight='bold', ha='center')
-        ax.text(x, y-1.0, '640x640', fontsize=10, ha='center', color='#666')
-    
-    @staticmethod
-    def _draw_backbone_step(ax, x: float, y: float):
-        """バックボーンステップを描画"""
-        # バックボーンの枠
-        rect = patches.Rectangle((x-0.8, y-0.6), 1.6, 1.2, 
-                               linewidth=2, edgecolor='#28a745', facecolor='#e8f5e8')
-        ax.add_patch(rect)
-        
-        # バックボーンアイコン
-        ax.text(x, y+0.1, '🔗', fontsize=24, ha='center')
-        
-        # ラベル
-        ax.text(x, y-0.8, 'バックボーン', fontsize=12, fontweight='bold', ha='center')
-        ax.text(x, y-1.0, 'CSPDarknet', fontsize=10, ha='center', color='#666')
-    
-    @staticmethod
-    def _draw_neck_step(ax, x: float, y: float):
-        """Neckステップを描画"""
-        # Neckの枠
-        rect = patches.Rectangle((x-0.8, y-0.6), 1.6, 1.2, 
-                               linewidth=2, edgecolor='#ffc107', facecolor='#fff8e1')
-        ax.add_patch(rect)
-        
-        # Neckアイコン
-        ax.text(x, y+0.1, '🔗', fontsize=24, ha='center')
-        
-        # ラベル
-        ax.text(x, y-0.8, 'Neck (FPN)', fontsize=12, fontweight='bold', ha='center')
-        ax.text(x, y-1.0, 'PANet', fontsize=10, ha='center', color='#666')
-    
-    @staticmethod
-    def _draw_head_step(ax, x: float, y: float):
-        """Headステップを描画"""
-        # Headの枠
-        rect = patches.Rectangle((x-0.8, y-0.6), 1.6, 1.2, 
-                               linewidth=2, edgecolor='#fd7e14', facecolor='#fff3e0')
-        ax.add_patch(rect)
-        
-        # Headアイコン
-        ax.text(x, y+0.1, '🎯', fontsize=24, ha='center')
-        
-        # ラベル
-        ax.text(x, y-0.8, 'Head', fontsize=12, fontweight='bold', ha='center')
-        ax.text(x, y-1.0, 'Anchor-Free', fontsize=10, ha='center', color='#666')
-    
-    @staticmethod
-    def _draw_detection_step(ax, x: float, y: float):
-        """検出結果ステップを描画"""
-        # 検出結果の枠
-        rect = patches.Rectangle((x-0.8, y-0.6), 1.6, 1.2, 
-                               linewidth=2, edgecolor='#dc3545', facecolor='#fce4ec')
-        ax.add_patch(rect)
-        
-        # 検出アイコン
-        ax.text(x, y+0.1, '📍', fontsize=24, ha='center')
-        
-        # ラベル
-        ax.text(x, y-0.8, '検出結果', fontsize=12, fontweight='bold', ha='center')
-        ax.text(x, y-1.0, 'バウンディングボックス', fontsize=10, ha='center', color='#666')
-    
-    @staticmethod
-    def _draw_arrows(ax):
-        """矢印を描画"""
-        # ステップ間の矢印
-        arrow_props = dict(arrowstyle='->', lw=2, color='#333')
-        
-        # 画像→バックボーン
-        ax.annotate('', xy=(2.7, 6), xytext=(2.3, 6), arrowprops=arrow_props)
-        ax.text(2.5, 6.3, '特徴抽出', fontsize=9, ha='center', 
-               bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
-        
-        # バックボーン→Neck
-        ax.annotate('', xy=(4.7, 6), xytext=(4.3, 6), arrowprops=arrow_props)
-        ax.text(4.5, 6.3, 'マルチスケール', fontsize=9, ha='center',
-               bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
-        
-        # Neck→Head
-        ax.annotate('', xy=(6.7, 6), xytext=(6.3, 6), arrowprops=arrow_props)
-        ax.text(6.5, 6.3, '予測', fontsize=9, ha='center',
-               bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
-        
-        # Head→検出
-        ax.annotate('', xy=(8.7, 6), xytext=(8.3, 6), arrowprops=arrow_props)
-        ax.text(8.5, 6.3, '後処理', fontsize=9, ha='center',
-               bbox=dict(boxstyle="round,pad=0.2", facecolor='white', alpha=0.8))
-    
-    @staticmethod
-    def create_architecture_diagram() -> plt.Figure:
+    def architecture_spec() -> DiagramSpec:
         """
-        YOLOv8のアーキテクチャ図を作成します
+        YOLOv8のアーキテクチャ図の描画情報を作成します
         
         Returns:
-            アーキテクチャ図のmatplotlib Figure
+            アーキテクチャ図のDiagramSpec
         """
-        fig, ax = plt.subplots(1, 1, figsize=(16, 12))
-        ax.set_xlim(0, 16)
-        ax.set_ylim(0, 12)
-        ax.axis('off')
-        
-        # 背景
-        ax.set_facecolor('#f8f9fa')
+        x = 8
+        rects = []
+        texts = []
+        arrows = []
+        layer_style = dict(fontsize=10, ha='center')
+        io_style = dict(fontsize=12, fontweight='bold', ha='center')
+        
+        def add_group_label(y: float, label: str, face: str):
+            texts.append(TextSpec(x-3, y+0.5, label,
+                                  dict(fontsize=12, fontweight='bold', ha='center',
+                                       bbox=dict(boxstyle="round,pad=0.3", facecolor=face, alpha=0.8))))
         
         # タイトル
-        ax.text(8, 11.5, '🚀 YOLOv8 アーキテクチャ', 
-                fontsize=20, fontweight='bold', ha='center',
-                bbox=dict(boxstyle="round,pad=0.5", facecolor='white', alpha=0.9))
+        texts.append(TextSpec(8, 11.5, 'YOLOv8 アーキテクチャ',
+                              dict(fontsize=20, fontweight='bold', ha='center',
+                                   bbox=dict(boxstyle="round,pad=0.5", facecolor='white', alpha=0.9))))
         
         # 入力層
-        YOLOv8Visualizer._draw_input_layer(ax, 8, 10)
-        
-        # バックボーン層
-        YOLOv8Visualizer._draw_backbone_layers(ax, 8, 8.5)
-        
-        # Neck層
-        YOLOv8Visualizer._draw_neck_layers(ax, 8, 6.5)
+        rects.append(RectSpec(x-2, 10-0.5, 4, 1, 2, '#007bff', '#e3f2fd'))
+        texts.append(TextSpec(x, 10, '入力画像 (640x640x3)', io_style))
+        
+        # バックボーン層（C2f×4 → SPPF、層間を矢印でつなぐ）
+        y = 8.5
+        backbone = [('C2f', 0.5), ('C2f', 1.0), ('C2f', 1.5), ('C2f', 2.0), ('SPPF', 2.5)]
+        for i, (layer_name, offset) in enumerate(backbone):
+            rects.append(RectSpec(x-1.5, y-offset, 3, 0.4, 1, '#28a745', '#e8f5e8'))
+            texts.append(TextSpec(x, y-offset+0.2, layer_name, layer_style))
+            if i < len(backbone) - 1:
+                arrows.append([[x, y-offset+0.4], [x, y-offset-0.2]])
+        add_group_label(y, 'バックボーン\n(CSPDarknet)', '#e8f5e8')
+        
+        # Neck層（上向きのFPN（P1〜P3）と下向きのPAN（N1〜N2））
+        y = 6.5
+        neck = [(f'P{i+1}', y-i*0.4) for i in range(3)]
+        neck += [(f'N{i+1}', y-1.2-i*0.4) for i in range(2)]
+        for layer_name, layer_y in neck:
+            rects.append(RectSpec(x-1.5, layer_y, 3, 0.3, 1, '#ffc107', '#fff8e1'))
+            texts.append(TextSpec(x, layer_y+0.15, layer_name, layer_style))
+        add_group_label(y, 'Neck\n(PANet)', '#fff8e1')
         
         # Head層
-        YOLOv8Visualizer._draw_head_layers(ax, 8, 4.5)
-        
-        # 出力層
-        YOLOv8Visualizer._draw_output_layer(ax, 8, 2.5)
-        
-        # 技術仕様
-        YOLOv8Visualizer._draw_technical_specs(ax, 1, 1)
-        
-        # 性能指標
-        YOLOv8Visualizer._draw_performance_metrics(ax, 12, 1)
-        
-        return fig
-    
-    @staticmethod
-    def _draw_input_layer(ax, x: float, y: float):
-        """入力層を描画"""
-        rect = patches.Rectangle((x-2, y-0.5), 4, 1, linewidth=2, edgecolor='#007bff', facecolor='#e3f2fd')
-        ax.add_patch(rect)
-        ax.text(x, y, '入力画像 (640x640x3)', fontsize=12, fontweight='bold', ha='center')
-    
-    @staticmethod
-    def _draw_backbone_layers(ax, x: float, y: float):
-        """バックボーン層を描画"""
-        layers = [
-            ('C2f', 0.5),
-            ('C2f', 1.0),
-            ('C2f', 1.5),
-            ('C2f', 2.0),
-            ('SPPF', 2.5)
-        ]
-        
-        for i, (layer_name, offset) in enumerate(layers):
-            rect = patches.Rectangle((x-1.5, y-offset), 3, 0.4, linewidth=1, edgecolor='#28a745', facecolor='#e8f5e8')
-            ax.add_patch(rect)
-            ax.text(x, y-offset+0.2, layer_name, fontsize=10, ha='center')
-            
-            if i < len(layers) - 1:
-                ax.annotate('', xy=(x, y-offset-0.2), xytext=(x, y-offset+0.4), 
-                           arrowprops=dict(arrowstyle='->', lw=1))
-        
-        ax.text(x-3, y+0.5, 'バックボーン\n(CSPDarknet)', fontsize=12, fontweight='bold', ha='center',
-               bbox=dict(boxstyle="round,pad=0.3", facecolor='#e8f5e8', alpha=0.8))
-    
-    @staticmethod
-    def _draw_neck_layers(ax, x: float, y: float):
-        """Neck層を描画"""
-        # 上向きのFPN
-        for i in range(3):
-            rect = patches.Rectangle((x-1.5, y-i*0.4), 3, 0.3, linewidth=1, edgecolor='#ffc107', facecolor='#fff8e1')
-            ax.add_patch(rect)
-            ax.text(x, y-i*0.4+0.15, f'P{i+1}', fontsize=10, ha='center')
-        
-        # 下向きのPAN
-        for i in range(2):
-            rect = patches.Rectangle((x-1.5, y-1.2-i*0.4), 3, 0.3, linewidth=1, edgecolor='#ffc107', facecolor='#fff8e1')
-            ax.add_patch(rect)
-            ax.text(x, y-1.2-i*0.4+0.15, f'N{i+1}', fontsize=10, ha='center')
-        
-        ax.text(x-3, y+0.5, 'Neck\n(PANet)', fontsize=12, fontweight='bold', ha='center',
-               bbox=dict(boxstyle="round,pad=0.3", facecolor='#fff8e1', alpha=0.8))
-    
-    @staticmethod
-    def _draw_head_layers(ax, x: float, y: float):
-        """Head層を描画"""
+        y = 4.5
         heads = ['Detection Head', 'Classification Head', 'Regression Head']
-        colors = ['#fd7e14', '#fd7e14', '#fd7e14']
+        for i, head_name in enumerate(heads):
+            rects.append(RectSpec(x-1.5, y-i*0.4, 3, 0.3, 1, '#fd7e14', '#fff3e0'))
+            texts.append(TextSpec(x, y-i*0.4+0.15, head_name, layer_style))
+        add_group_label(y, 'Head\n(Anchor-Free)', '#fff3e0')
         
-        for i, (head_name, color) in enumerate(zip(heads, colors)):
-            rect = patches.Rectangle((x-1.5, y-i*0.4), 3, 0.3, linewidth=1, edgecolor=color, facecolor='#fff3e0')
-            ax.add_patch(rect)
-            ax.text(x, y-i*0.4+0.15, head_name, fontsize=10, ha='center')
+        # 出力層
+        rects.append(RectSpec(x-2, 2.5-0.5, 4, 1, 2, '#dc3545', '#fce4ec'))
+        texts.append(TextSpec(x, 2.5, '検出結果 (バウンディングボックス + クラス)', io_style))
         
-        ax.text(x-3, y+0.5, 'Head\n(Anchor-Free)', fontsize=12, fontweight='bold', ha='center',
-               bbox=dict(boxstyle="round,pad=0.3", facecolor='#fff3e0', alpha=0.8))
-    
-    @staticmethod
-    def _draw_output_layer(ax, x: float, y: float):
-        """出力層を描画"""
-        rect = patches.Rectangle((x-2, y-0.5), 4, 1, linewidth=2, edgecolor='#dc3545', facecolor='#fce4ec')
-        ax.add_patch(rect)
-        ax.text(x, y, '検出結果 (バウンディングボックス + クラス)', fontsize=12, fontweight='bold', ha='center')
-    
-    @staticmethod
-    def _draw_technical_specs(ax, x: float, y: float):
-        """技術仕様を描画"""
+        # 技術仕様と性能指標（1行ずつTextを作らず、複数行の1つのTextとして描画する）
+        # 下端を軸の範囲内に固定して上へ伸ばし、フォントによらず図の外にはみ出さないようにする
         specs = [
-            '🔧 技術仕様:',
+            '技術仕様:',
             '• パラメータ数: 3.2M (nano)',
             '• 入力サイズ: 640x640',
             '• アーキテクチャ: CSPDarknet',
@@ -321,31 +318,46 @@ class YOLOv8Visualizer:
             '• 最適化器: AdamW',
             '• 学習率: 0.01'
         ]
-        
-        for i, spec in enumerate(specs):
-            ax.text(x, y-i*0.4, spec, fontsize=10, ha='left',
-                   bbox=dict(boxstyle="round,pad=0.2", facecolor='#e9ecef', alpha=0.8))
-    
-    @staticmethod
-    def _draw_performance_metrics(ax, x: float, y: float):
-        """性能指標を描画"""
         metrics = [
-            '📊 性能指標 (COCO):',
+            '性能指標 (COCO):',
             '• mAP@0.5: 0.637 (nano)',
             '• mAP@0.5:0.95: 0.454 (nano)',
             '• 推論速度: 8.7ms (GPU)',
             '• 推論速度: 23.4ms (CPU)',
             '',
-            '🏆 特徴:',
+            '特徴:',
             '• リアルタイム検出',
             '• 高精度',
             '• 軽量モデル',
             '• マルチスケール対応'
         ]
+        panel_style = dict(fontsize=10, ha='left', va='bottom', linespacing=1.4,
+                           bbox=dict(boxstyle="round,pad=0.3", facecolor='#e9ecef', alpha=0.8))
+        texts.append(TextSpec(1, 0.3, "\n".join(specs), panel_style))
+        texts.append(TextSpec(12, 0.3, "\n".join(metrics), panel_style))
         
-        for i, metric in enumerate(metrics):
-            ax.text(x, y-i*0.4, metric, fontsize=10, ha='left',
-                   bbox=dict(boxstyle="round,pad=0.2", facecolor='#e9ecef', alpha=0.8))
+        return DiagramSpec((16, 12), (0, 16), (0, 12), tuple(rects), tuple(texts),
+                           np.array(arrows, dtype=float), 1)
+    
+    @staticmethod
+    def create_processing_flow_diagram() -> plt.Figure:
+        """
+        YOLOv8の処理フロー図を作成します
+        
+        Returns:
+            処理フロー図のmatplotlib Figure
+        """
+        return YOLOv8Visualizer.render_diagram(YOLOv8Visualizer.processing_flow_spec())
+    
+    @staticmethod
+    def create_architecture_diagram() -> plt.Figure:
+        """
+        YOLOv8のアーキテクチャ図を作成します
+        
+        Returns:
+            アーキテクチャ図のmatplotlib Figure
+        """
+        return YOLOv8Visualizer.render_diagram(YOLOv8Visualizer.architecture_spec())
     
     @staticmethod
     def create_detailed_comparison() -> plt.Figure:
@@ -355,97 +367,86 @@ class YOLOv8Visualizer:
         Returns:
             詳細比較図のmatplotlib Figure
         """
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('🚀 YOLOv8 詳細比較', fontsize=20, fontweight='bold')
+        data = YOLOv8Visualizer.DATA
+        
+        fig = plt.figure(figsize=(16, 12))
+        fig.suptitle('YOLOv8 詳細比較', fontsize=20, fontweight='bold')
+        
+        # 余白はGridSpecで固定し、tight_layoutによる再レイアウトを行わない
+        gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.25, top=0.92)
         
         # サブプロット1: モデルサイズ比較
-        ax1 = axes[0, 0]
-        YOLOv8Visualizer._draw_model_size_comparison(ax1)
+        ax1 = fig.add_subplot(gs[0, 0])
+        YOLOv8Visualizer._draw_model_size_comparison(ax1, data)
         
         # サブプロット2: 精度比較
-        ax2 = axes[0, 1]
-        YOLOv8Visualizer._draw_accuracy_comparison(ax2)
+        ax2 = fig.add_subplot(gs[0, 1])
+        YOLOv8Visualizer._draw_accuracy_comparison(ax2, data)
         
         # サブプロット3: 速度比較
-        ax3 = axes[1, 0]
-        YOLOv8Visualizer._draw_speed_comparison(ax3)
+        ax3 = fig.add_subplot(gs[1, 0])
+        YOLOv8Visualizer._draw_speed_comparison(ax3, data)
         
         # サブプロット4: 特徴比較
-        ax4 = axes[1, 1]
+        ax4 = fig.add_subplot(gs[1, 1])
         YOLOv8Visualizer._draw_feature_comparison(ax4)
         
-        plt.tight_layout()
         return fig
     
     @staticmethod
-    def _draw_model_size_comparison(ax):
+    def _draw_model_size_comparison(ax, data: np.recarray):
         """モデルサイズ比較を描画"""
-        ax.set_title('📏 モデルサイズ比較', fontsize=14, fontweight='bold')
-        
-        models = ['YOLOv8n', 'YOLOv8s', 'YOLOv8m', 'YOLOv8l', 'YOLOv8x']
-        params = [3.2, 11.2, 25.9, 43.7, 68.2]  # 百万パラメータ
+        ax.set_title('モデルサイズ比較', fontsize=14, fontweight='bold')
         
-        bars = ax.bar(models, params, color=['#007bff', '#28a745', '#ffc107', '#fd7e14', '#dc3545'])
+        bars = ax.bar(data.model, data.params_m, color=YOLOv8Visualizer.MODEL_COLORS)
         ax.set_ylabel('パラメータ数 (M)')
         ax.set_xlabel('モデル')
         
         # バーの上に値を表示
-        for bar, param in zip(bars, params):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5, 
-                   f'{param}M', ha='center', va='bottom', fontweight='bold')
+        ax.bar_label(bars, fmt='%gM', padding=2, fontweight='bold')
     
     @staticmethod
-    def _draw_accuracy_comparison(ax):
+    def _draw_accuracy_comparison(ax, data: np.recarray):
         """精度比較を描画"""
-        ax.set_title('🎯 精度比較 (mAP@0.5)', fontsize=14, fontweight='bold')
+        ax.set_title('精度比較 (mAP@0.5)', fontsize=14, fontweight='bold')
         
-        models = ['YOLOv8n', 'YOLOv8s', 'YOLOv8m', 'YOLOv8l', 'YOLOv8x']
-        mAP = [0.637, 0.718, 0.764, 0.792, 0.814]
-        
-        bars = ax.bar(models, mAP, color=['#007bff', '#28a745', '#ffc107', '#fd7e14', '#dc3545'])
+        bars = ax.bar(data.model, data.map50, color=YOLOv8Visualizer.MODEL_COLORS)
         ax.set_ylabel('mAP@0.5')
         ax.set_xlabel('モデル')
         ax.set_ylim(0, 1)
         
         # バーの上に値を表示
-        for bar, map_val in zip(bars, mAP):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01, 
-                   f'{map_val:.3f}', ha='center', va='bottom', fontweight='bold')
+        ax.bar_label(bars, fmt='%.3f', padding=2, fontweight='bold')
     
     @staticmethod
-    def _draw_speed_comparison(ax):
+    def _draw_speed_comparison(ax, data: np.recarray):
         """速度比較を描画"""
-        ax.set_title('⚡ 推論速度比較 (GPU)', fontsize=14, fontweight='bold')
-        
-        models = ['YOLOv8n', 'YOLOv8s', 'YOLOv8m', 'YOLOv8l', 'YOLOv8x']
-        fps = [115, 85, 52, 39, 28]  # FPS
+        ax.set_title('推論速度比較 (GPU)', fontsize=14, fontweight='bold')
         
-        bars = ax.bar(models, fps, color=['#007bff', '#28a745', '#ffc107', '#fd7e14', '#dc3545'])
+        bars = ax.bar(data.model, data.fps_gpu, color=YOLOv8Visualizer.MODEL_COLORS)
         ax.set_ylabel('FPS')
         ax.set_xlabel('モデル')
         
         # バーの上に値を表示
-        for bar, fps_val in zip(bars, fps):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, 
-                   f'{fps_val}', ha='center', va='bottom', fontweight='bold')
+        ax.bar_label(bars, fmt='%d', padding=2, fontweight='bold')
     
     @staticmethod
     def _draw_feature_comparison(ax):
         """特徴比較を描画"""
-        ax.set_title('🔧 主要特徴', fontsize=14, fontweight='bold')
+        ax.set_title('主要特徴', fontsize=14, fontweight='bold')
         ax.set_xlim(0, 10)
         ax.set_ylim(0, 10)
         ax.axis('off')
         
         features = [
-            '🚀 Anchor-Free設計',
-            '🔗 CSPDarknetバックボーン',
-            '📊 PANet (FPN + PAN)',
-            '🎯 マルチスケール検出',
-            '⚡ 高速推論',
-            '📱 エッジデバイス対応',
-            '🔄 自動学習率調整',
-            '📈 高精度検出'
+            '• Anchor-Free設計',
+            '• CSPDarknetバックボーン',
+            '• PANet (FPN + PAN)',
+            '• マルチスケール検出',
+            '• 高速推論',
+            '• エッジデバイス対応',
+            '• 自動学習率調整',
+            '• 高精度検出'
         ]
         
         for i, feature in enumerate(features):
@@ -454,9 +455,192 @@ class YOLOv8Visualizer:
                    bbox=dict(boxstyle="round,pad=0.3", facecolor='#e9ecef', alpha=0.8))
 
 
+# ラスタライズ・SVG化の共通オプション
+# 配置は手動で固定しているため、bbox_inches='tight'による再レイアウト・再描画は行わない
+# （すべてのテキストが図の内側に収まることはテストで確認している）
+_SAVEFIG_KWARGS = dict(bbox_inches=None, pad_inches=0, facecolor='#f8f9fa')
+
+
+# 可視化タブの説明文（リランごとに文字列を作らないようモジュール定数にする）
+_MD_FLOW = """
+**処理フロー図の説明:**
+- 📷 **画像入力**: 640x640のRGB画像を入力
+- 🔗 **バックボーン**: CSPDarknetによる特徴抽出
+- 🔗 **Neck (FPN)**: PANetによるマルチスケール特徴融合
+- 🎯 **Head**: Anchor-Free設計による予測
+- 📍 **検出結果**: バウンディングボックスとクラス予測
+"""
+
+_MD_ARCH = """
+**アーキテクチャ図の説明:**
+
+**🔧 技術仕様:**
+- パラメータ数: 3.2M (nano) 〜 68.2M (xlarge)
+- 入力サイズ: 640x640ピクセル
+- アーキテクチャ: CSPDarknet + PANet + Anchor-Free Head
+
+**📊 性能指標:**
+- mAP@0.5: 0.637 (nano) 〜 0.814 (xlarge)
+- 推論速度: 8.7ms (GPU) 〜 35.7ms (GPU)
+- リアルタイム性能: 28-115 FPS
+"""
+
+_MD_COMPARISON = """
+**詳細比較図の説明:**
+
+この図は、YOLOv8の各モデルサイズの性能を比較しています。
+
+**モデル選択のガイド:**
+- **YOLOv8n**: 軽量で高速、エッジデバイス向け
+- **YOLOv8s**: バランス型、一般的な用途
+- **YOLOv8m**: 高精度、サーバー向け
+- **YOLOv8l**: 最高精度、研究用途
+- **YOLOv8x**: 最大精度、特殊用途
+"""
+
+# 折りたたみ表示する補足情報
+_MD_TECHNICAL_DETAILS = """
+**YOLOv8のアーキテクチャ詳細:**
+
+**1. CSPDarknet バックボーン**
+- CSP (Cross Stage Partial) 接続
+- 効率的な特徴抽出
+- 軽量で高性能
+
+**2. PANet (Path Aggregation Network)**
+- FPN (Feature Pyramid Network) + PAN
+- マルチスケール特徴融合
+- 小物体検出性能向上
+
+**3. Anchor-Free Head**
+- アンカーボックス不要
+- 直接的な座標予測
+- シンプルで効率的
+
+**4. 損失関数**
+- BCE (Binary Cross Entropy): 分類損失
+- CIoU (Complete IoU): 回帰損失
+- DFL (Distribution Focal Loss): 分布学習
+
+**5. 最適化**
+- AdamW 最適化器
+- 自動学習率調整
+- 余弦アニーリング
+"""
+
+_MD_PERFORMANCE = """
+**処理時間の目安 (RTX 3080):**
+
+| モデル | パラメータ数 | mAP@0.5 | FPS | メモリ使用量 |
+|--------|-------------|---------|-----|-------------|
+| YOLOv8n | 3.2M | 0.637 | 115 | ~1GB |
+| YOLOv8s | 11.2M | 0.718 | 85 | ~2GB |
+| YOLOv8m | 25.9M | 0.764 | 52 | ~3GB |
+| YOLOv8l | 43.7M | 0.792 | 39 | ~4GB |
+| YOLOv8x | 68.2M | 0.814 | 28 | ~6GB |
+
+**精度と速度のトレードオフ:**
+- 軽量モデル: 高速だが精度が低い
+- 大規模モデル: 高精度だが低速
+- 用途に応じて適切なモデルを選択
+
+**エッジデバイス対応:**
+- YOLOv8n: モバイル、IoTデバイス
+- YOLOv8s: 組み込みシステム
+- 量子化、プルーニング対応
+"""
+
+_MD_FEATURES = """
+**🚀 主要な特徴:**
+
+**1. Anchor-Free設計**
+- アンカーボックスが不要
+- シンプルで効率的
+- 学習が容易
+
+**2. マルチスケール検出**
+- 異なるサイズの物体を検出
+- FPN + PANによる特徴融合
+- 小物体検出性能向上
+
+**3. リアルタイム性能**
+- 高速推論
+- 低レイテンシー
+- エッジデバイス対応
+
+**4. 高精度**
+- 最新の損失関数
+- 効率的なアーキテクチャ
+- データ拡張技術
+
+**5. 使いやすさ**
+- シンプルなAPI
+- 豊富なドキュメント
+- 活発なコミュニティ
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def _cached_figure(builder_name: str) -> plt.Figure:
+    """
+    静的な図を一度だけ作成し、リラン・セッション間で共有します
+    
+    Args:
+        builder_name: YOLOv8Visualizerの図作成メソッド名
+        
+    Returns:
+        作成済みのmatplotlib Figure
+    """
+    return getattr(YOLOv8Visualizer, builder_name)()
+
+
+@st.cache_data(show_spinner=False)
+def _cached_png(builder_name: str) -> bytes:
+    """
+    静的な図を一度だけPNGにラスタライズし、そのバイト列を再利用します
+    
+    リランのたびにst.pyplotでAggの描画をやり直さないよう、描画済みの画像を配信します。
+    
+    Args:
+        builder_name: YOLOv8Visualizerの図作成メソッド名
+        
+    Returns:
+        PNG画像のバイト列
+    """
+    buffer = io.BytesIO()
+    _cached_figure(builder_name).savefig(buffer, format='png', dpi=90, **_SAVEFIG_KWARGS)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def _cached_svg(builder_name: str) -> str:
+    """
+    図形とテキストだけの図を一度だけSVGに変換し、その文字列を再利用します
+    
+    大きな図でもPNGよりデータ量が小さく、ブラウザ側でどの表示幅でも鮮明に描画されます。
+    
+    Args:
+        builder_name: YOLOv8Visualizerの図作成メソッド名
+        
+    Returns:
+        SVG文字列
+    """
+    buffer = io.StringIO()
+    _cached_figure(builder_name).savefig(buffer, format='svg', **_SAVEFIG_KWARGS)
+    return buffer.getvalue()
+
+
 class YOLOv8VisualizationManager:
     """YOLOv8の可視化を管理するクラス"""
     
+    # 可視化タイプ → (図のキャッシュ関数, 図作成メソッド名, 説明文)
+    # 図形とテキストだけの図はSVG、棒グラフを含む比較図はPNGで配信する
+    _DISPATCH = {
+        "処理フロー図": (_cached_svg, "create_processing_flow_diagram", _MD_FLOW),
+        "アーキテクチャ図": (_cached_svg, "create_architecture_diagram", _MD_ARCH),
+        "詳細比較図": (_cached_png, "create_detailed_comparison", _MD_COMPARISON)
+    }
+    
     @staticmethod
     def display_yolo_visualization() -> None:
         """YOLOv8の可視化を表示します"""
@@ -465,140 +649,29 @@ class YOLOv8VisualizationManager:
         # 可視化タイプの選択
         viz_type = st.selectbox(
             "可視化タイプを選択",
-            ["処理フロー図", "アーキテクチャ図", "詳細比較図"],
+            list(YOLOv8VisualizationManager._DISPATCH),
             help="YOLOv8の異なる側面を可視化"
         )
         
-        if viz_type == "処理フロー図":
-            fig = YOLOv8Visualizer.create_processing_flow_diagram()
-            st.pyplot(fig)
-            
-            st.markdown("""
-            **処理フロー図の説明:**
-            - 📷 **画像入力**: 640x640のRGB画像を入力
-            - 🔗 **バックボーン**: CSPDarknetによる特徴抽出
-            - 🔗 **Neck (FPN)**: PANetによるマルチスケール特徴融合
-            - 🎯 **Head**: Anchor-Free設計による予測
-            - 📍 **検出結果**: バウンディングボックスとクラス予測
-            """)
-            
-        elif viz_type == "アーキテクチャ図":
-            fig = YOLOv8Visualizer.create_architecture_diagram()
-            st.pyplot(fig)
-            
-            st.markdown("""
-            **アーキテクチャ図の説明:**
-            
-            **🔧 技術仕様:**
-            - パラメータ数: 3.2M (nano) 〜 68.2M (xlarge)
-            - 入力サイズ: 640x640ピクセル
-            - アーキテクチャ: CSPDarknet + PANet + Anchor-Free Head
-            
-            **📊 性能指標:**
-            - mAP@0.5: 0.637 (nano) 〜 0.814 (xlarge)
-            - 推論速度: 8.7ms (GPU) 〜 35.7ms (GPU)
-            - リアルタイム性能: 28-115 FPS
-            """)
-            
-        elif viz_type == "詳細比較図":
-            fig = YOLOv8Visualizer.create_detailed_comparison()
-            st.pyplot(fig)
-            
-            st.markdown("""
-            **詳細比較図の説明:**
-            
-            この図は、YOLOv8の各モデルサイズの性能を比較しています。
-            
-            **モデル選択のガイド:**
-            - **YOLOv8n**: 軽量で高速、エッジデバイス向け
-            - **YOLOv8s**: バランス型、一般的な用途
-            - **YOLOv8m**: 高精度、サーバー向け
-            - **YOLOv8l**: 最高精度、研究用途
-            - **YOLOv8x**: 最大精度、特殊用途
-            """)
+        # 選択が変わったときだけキャッシュから図を取り出してセッション状態に保存し、
+        # 同じ選択のままのリランではcache_dataの引数ハッシュと戻り値の複製を行わない
+        # （Streamlitはリランのたびに要素を描き直すため、表示自体は毎回行う）
+        render, builder_name, description = YOLOv8VisualizationManager._DISPATCH[viz_type]
+        if st.session_state.get('last_viz') != viz_type:
+            st.session_state.last_viz_image = render(builder_name)
+            st.session_state.last_viz = viz_type
+        
+        st.image(st.session_state.last_viz_image, use_container_width=True)
+        st.markdown(description)
         
         # 技術的な詳細情報
         with st.expander("🔧 技術的な詳細"):
-            st.markdown("""
-            **YOLOv8のアーキテクチャ詳細:**
-            
-            **1. CSPDarknet バックボーン**
-            - CSP (Cross Stage Partial) 接続
-            - 効率的な特徴抽出
-            - 軽量で高性能
-            
-            **2. PANet (Path Aggregation Network)**
-            - FPN (Feature Pyramid Network) + PAN
-            - マルチスケール特徴融合
-            - 小物体検出性能向上
-            
-            **3. Anchor-Free Head**
-            - アンカーボックス不要
-            - 直接的な座標予測
-            - シンプルで効率的
-            
-            **4. 損失関数**
-            - BCE (Binary Cross Entropy): 分類損失
-            - CIoU (Complete IoU): 回帰損失
-            - DFL (Distribution Focal Loss): 分布学習
-            
-            **5. 最適化**
-            - AdamW 最適化器
-            - 自動学習率調整
-            - 余弦アニーリング
-            """)
+            st.markdown(_MD_TECHNICAL_DETAILS)
         
         # パフォーマンス情報
         with st.expander("⚡ パフォーマンス情報"):
-            st.markdown("""
-            **処理時間の目安 (RTX 3080):**
-            
-            | モデル | パラメータ数 | mAP@0.5 | FPS | メモリ使用量 |
-            |--------|-------------|---------|-----|-------------|
-            | YOLOv8n | 3.2M | 0.637 | 115 | ~1GB |
-            | YOLOv8s | 11.2M | 0.718 | 85 | ~2GB |
-            | YOLOv8m | 25.9M | 0.764 | 52 | ~3GB |
-            | YOLOv8l | 43.7M | 0.792 | 39 | ~4GB |
-            | YOLOv8x | 68.2M | 0.814 | 28 | ~6GB |
-            
-            **精度と速度のトレードオフ:**
-            - 軽量モデル: 高速だが精度が低い
-            - 大規模モデル: 高精度だが低速
-            - 用途に応じて適切なモデルを選択
-            
-            **エッジデバイス対応:**
-            - YOLOv8n: モバイル、IoTデバイス
-            - YOLOv8s: 組み込みシステム
-            - 量子化、プルーニング対応
-            """)
+            st.markdown(_MD_PERFORMANCE)
         
         # YOLOv8の特徴
         with st.expander("🏆 YOLOv8の特徴"):
-            st.markdown("""
-            **🚀 主要な特徴:**
-            
-            **1. Anchor-Free設計**
-            - アンカーボックスが不要
-            - シンプルで効率的
-            - 学習が容易
-            
-            **2. マルチスケール検出**
-            - 異なるサイズの物体を検出
-            - FPN + PANによる特徴融合
-            - 小物体検出性能向上
-            
-            **3. リアルタイム性能**
-            - 高速推論
-            - 低レイテンシー
-            - エッジデバイス対応
-            
-            **4. 高精度**
-            - 最新の損失関数
-            - 効率的なアーキテクチャ
-            - データ拡張技術
-            
-            **5. 使いやすさ**
-            - シンプルなAPI
-            - 豊富なドキュメント
-            - 活発なコミュニティ
-            """) 
\ No newline at end of file
+            st.markdown(_MD_FEATURES) 
\ No newline at end of file